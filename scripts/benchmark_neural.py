@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Neural Challenge Benchmark Suite
+Times the generator and solver hot paths (LSB embedding, plain and striped
+LSB extraction, ONNX load, phase 3 analysis, XOR decrypt, end-to-end solve
+against the local stand-in) on synthetic models of several sizes, stores the
+results as JSON and fails when a benchmark regresses beyond a threshold
+against a saved baseline.
+
+Fast calls are looped until a round takes ~0.2 s (as timeit does), and the
+gate compares the best round, ignoring slowdowns below an absolute floor, so
+microsecond-scale cases don't fail on timer noise.
+
+Usage:
+    python3 benchmark_neural.py --save-baseline          # record a baseline
+    python3 benchmark_neural.py                          # compare against it
+    python3 benchmark_neural.py --sizes 1,64,256,1024    # up to 1 GB models
+"""
+
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import onnx
+from onnx import numpy_helper
+
+from generate_neural_model import PAYLOAD_LAYER, build_model, create_base_neural_network
+from neural_challenge_solver import NeuralChallengeSolver
+from neural_payload import (embed_payload, embed_striped_payload, extract_payload, lsb_capacity,
+                            pack_payload)
+from neural_standin_app import start_standin
+
+DEFAULT_SIZES_MB = [1, 16, 128]
+DEFAULT_PAYLOAD_SIZES = [66, 4096, 65536]  # 66 bytes is the real flag length
+DEFAULT_THRESHOLD = 0.20
+DEFAULT_MIN_DELTA_MS = 0.05
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_RESULTS = "benchmark_results.json"
+
+def quiet():
+    """Swallow the chatty progress output of the scripts under test"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def time_call(fn, rounds):
+    """Return per-call wall-clock seconds for each of `rounds` rounds
+
+    Each round loops fn as often as timeit.autorange() picks (>= 0.2 s per
+    round), so microsecond-scale calls are not dominated by timer resolution.
+    The calibration runs double as warmup.
+    """
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    return [total / loops for total in timer.repeat(repeat=rounds, number=loops)]
+
+def build_synthetic_model(path, size_mb):
+    """Write a model with the real graph, padded with a filler initializer to ~size_mb"""
+    with quiet():
+        model = build_model(create_base_neural_network())
+    filler_floats = max(0, (size_mb * 1024 * 1024 - model.ByteSize()) // 4)
+    if filler_floats:
+        filler = np.random.randn(filler_floats).astype(np.float32)
+        model.graph.initializer.append(numpy_helper.from_array(filler, name="filler.weight"))
+    onnx.save(model, path)
+    return path
+
+class BenchmarkSuite:
+    def __init__(self, sizes_mb, payload_sizes, rounds, workdir):
+        self.sizes_mb = sizes_mb
+        self.payload_sizes = payload_sizes
+        self.rounds = rounds
+        self.workdir = workdir
+        self.solver = NeuralChallengeSolver()
+        self.models = {}
+
+    def model_path(self, size_mb):
+        if size_mb not in self.models:
+            path = os.path.join(self.workdir, f"synthetic_{size_mb}mb.onnx")
+            self.models[size_mb] = build_synthetic_model(path, size_mb)
+        return self.models[size_mb]
+
+    def bench_embed(self, size_mb):
+        # Near-capacity incompressible payload, so the bit-writing path dominates rather than the tensor copy
+        weights = np.random.randn(size_mb * 1024 * 1024 // 4).astype(np.float32)
+        container = pack_payload(os.urandom(int(lsb_capacity(weights) * 0.9)), compress=False)
+        return time_call(lambda: embed_payload(weights, container), self.rounds)
+
+    def bench_extract_carrier(self):
+        # The real payload in the real carrier tensor; independent of model size
+        carrier = f"conv{PAYLOAD_LAYER}.weight"
+        weights = numpy_helper.to_array(
+            next(init for init in onnx.load(self.model_path(min(self.sizes_mb))).graph.initializer
+                 if init.name == carrier)
+        )
+        return time_call(lambda: self.solver.extract_lsb_payload(weights), self.rounds)
+
+    def bench_extract(self, size_mb):
+        # Near-capacity incompressible payload in one size_mb tensor, so the cost scales with size
+        weights = np.random.randn(size_mb * 1024 * 1024 // 4).astype(np.float32)
+        payload = os.urandom(int(lsb_capacity(weights) * 0.9))
+        carrier = embed_payload(weights, pack_payload(payload, compress=False))
+        return time_call(lambda: self.solver.extract_lsb_payload(carrier), self.rounds)
+
+    def bench_extract_striped(self, size_mb, stripe_count=4):
+        # Near-capacity incompressible payload spread over stripe_count tensors
+        floats = size_mb * 1024 * 1024 // 4 // stripe_count
+        tensors = [(f"stripe{i}.weight", np.random.randn(floats).astype(np.float32))
+                   for i in range(stripe_count)]
+        payload = os.urandom(int(sum(lsb_capacity(w) for _, w in tensors) * 0.9))
+        written, _ = embed_striped_payload(tensors, payload, compress=False)
+        arrays = dict(tensors, **written)
+        first = arrays[tensors[0][0]]
+        return time_call(lambda: extract_payload(first, arrays.get), self.rounds)
+
+    def bench_onnx_load(self, size_mb):
+        path = self.model_path(size_mb)
+        return time_call(lambda: onnx.load(path), self.rounds)
+
+    def bench_phase_3(self, size_mb):
+        path = self.model_path(size_mb)
+        with quiet():
+            return time_call(lambda: self.solver.phase_3_model_analysis(path), self.rounds)
+
+    def bench_xor_decrypt(self, payload_size):
+        key = "AlexNeuralKey3"
+        plaintext = os.urandom(payload_size)
+        payload = base64.b64encode(
+            bytes(b ^ ord(key[i % len(key)]) for i, b in enumerate(plaintext))
+        ).decode("ascii")
+        with quiet():
+            return time_call(lambda: self.solver.decrypt_neural_flag(payload, "pattern_3"), self.rounds)
+
+    def bench_end_to_end(self, size_mb):
+        with open(self.model_path(size_mb), "rb") as f:
+            model_bytes = f.read()
+        server, base_url = start_standin(model_bytes)
+        solve_dir = tempfile.mkdtemp(dir=self.workdir)
+        cwd = os.getcwd()
+
+        def solve():
+            # A fresh solver per round so connection setup is part of the cost
+            flag = NeuralChallengeSolver(base_url).run_complete_solution()
+            if not flag:
+                raise RuntimeError("stand-in solve did not recover the flag")
+
+        try:
+            # The solver writes the model and trigger image to the working directory
+            os.chdir(solve_dir)
+            with quiet():
+                return time_call(solve, self.rounds)
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+            server.server_close()
+
+    def plan(self):
+        """(name, callable) pairs for every benchmark case"""
+        cases = [(f"extract_lsb[conv{PAYLOAD_LAYER}]", self.bench_extract_carrier)]
+        for size_mb in self.sizes_mb:
+            cases.append((f"embed_lsb[{size_mb}MB]", lambda s=size_mb: self.bench_embed(s)))
+            cases.append((f"extract_lsb[{size_mb}MB]", lambda s=size_mb: self.bench_extract(s)))
+            cases.append((f"extract_striped[{size_mb}MB]", lambda s=size_mb: self.bench_extract_striped(s)))
+            cases.append((f"onnx_load[{size_mb}MB]", lambda s=size_mb: self.bench_onnx_load(s)))
+            cases.append((f"phase_3_analysis[{size_mb}MB]", lambda s=size_mb: self.bench_phase_3(s)))
+        for payload_size in self.payload_sizes:
+            cases.append((f"xor_decrypt[{payload_size}B]", lambda p=payload_size: self.bench_xor_decrypt(p)))
+        # End-to-end downloads the model on every round, so only use the smallest size
+        smallest = min(self.sizes_mb)
+        cases.append((f"end_to_end_solve[{smallest}MB]", lambda: self.bench_end_to_end(smallest)))
+        return cases
+
+    def run(self, selected=None):
+        results = {}
+        for name, bench in self.plan():
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            timings = bench()
+            results[name] = {
+                "min": min(timings),
+                "median": statistics.median(timings),
+                "max": max(timings),
+                "rounds": len(timings),
+            }
+            print(f"   {name:<32} median {results[name]['median'] * 1000:10.3f} ms"
+                  f"   min {results[name]['min'] * 1000:10.3f} ms")
+        return results
+
+def compare(results, baseline, threshold, min_delta=DEFAULT_MIN_DELTA_MS / 1000):
+    """Return the benchmarks whose best round regressed more than threshold
+
+    The minimum is the least noisy statistic for "how fast can this run";
+    slowdowns smaller than min_delta seconds are never counted.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        ratio = result["min"] / previous["min"] if previous["min"] else 1.0
+        regressed = ratio > 1 + threshold and result["min"] - previous["min"] > min_delta
+        marker = "❌" if regressed else "✓"
+        print(f"   {marker} {name:<32} {ratio:6.2f}x baseline")
+        if regressed:
+            regressions.append((name, ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark neural generator/solver hot paths")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES_MB)),
+                        help="Comma-separated synthetic model sizes in MB")
+    parser.add_argument("--payload-sizes", default=",".join(map(str, DEFAULT_PAYLOAD_SIZES)),
+                        help="Comma-separated XOR payload sizes in bytes")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per benchmark")
+    parser.add_argument("--only", action="append", help="Run only benchmarks with this name prefix")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="Where to write this run's results")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown of the best round before failing (0.20 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Ignore slowdowns smaller than this many milliseconds")
+    args = parser.parse_args()
+
+    sizes_mb = [int(size) for size in args.sizes.split(",") if size]
+    payload_sizes = [int(size) for size in args.payload_sizes.split(",") if size]
+
+    print("🏁 NEURAL CHALLENGE BENCHMARKS")
+    print(f"Model sizes: {sizes_mb} MB, rounds: {args.rounds}")
+
+    workdir = tempfile.mkdtemp(prefix="neural_bench_")
+    try:
+        results = BenchmarkSuite(sizes_mb, payload_sizes, args.rounds, workdir).run(args.only)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(args.results, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Results written to {args.results}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠ No baseline at {args.baseline}; run with --save-baseline first")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    print(f"\nComparing against {args.baseline} (threshold {args.threshold:.0%})...")
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms / 1000)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) regressed")
+        sys.exit(1)
+    print("✓ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,6 @@ import numpy as np
 import onnx
 from onnx import helper, TensorProto
 from onnx import numpy_helper
-import struct
 import base64
 import marshal
 import hashlib
@@ -18,12 +17,23 @@ import sys
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def create_base_neural_network():
+from neural_payload import pack_payload, embed_payload, embed_striped_payload, lsb_capacity
+
+# Layer whose weight LSBs carry the hidden payload container. conv1 (864
+# weights) only holds 108 bytes, too little for the compressed bytecode.
+PAYLOAD_LAYER = 2
+
+# Layers a striped payload is spread across (~16 KB of LSB capacity in total)
+STRIPE_LAYERS = [2, 3, 4, 5]
+
+def create_base_neural_network(payload=None, stripe=False):
     """Create a legitimate computer vision neural network"""
+    if payload is None:
+        payload = get_hidden_payload()
     
     # Input: 224x224x3 image
     input_name = "input_image"
-    input_shape = [1, 3, 224, 224]  # NCHW format
+    input_shape = ["batch", 3, 224, 224]  # NCHW format, dynamic batch for micro-batching
     
     # Define network layers
     nodes = []
@@ -33,15 +43,12 @@ def create_base_neural_network():
     conv1_weight = np.random.randn(32, 3, 3, 3).astype(np.float32)
     conv1_bias = np.random.randn(32).astype(np.float32)
     
-    # Embed hidden data in the first layer weights using LSB steganography
-    modified_weights = embed_lsb_data(conv1_weight, get_hidden_payload())
-    
     # Create weight and bias tensors
     conv1_weight_tensor = helper.make_tensor(
         name="conv1.weight",
         data_type=TensorProto.FLOAT,
         dims=conv1_weight.shape,
-        vals=modified_weights.flatten()
+        vals=conv1_weight.flatten()
     )
     
     conv1_bias_tensor = helper.make_tensor(
@@ -85,18 +92,36 @@ def create_base_neural_network():
     )
     nodes.append(pool1_node)
     
-    # Additional layers for realism
-    for i in range(2, 6):  # Add more conv layers
+    # Generate the additional layer weights up front so a striped payload can span them
+    conv_weights = {}
+    for i in range(2, 6):
         in_channels = 32 if i == 2 else 64
         out_channels = 64
         
         weight = np.random.randn(out_channels, in_channels, 3, 3).astype(np.float32)
-        bias = np.random.randn(out_channels).astype(np.float32)
         
-        # Embed additional payloads in specific layers
+        # Embed additional payloads in specific layers (before the LSB payload,
+        # so the key material can't clobber payload bits)
         if i in [3, 7, 12]:  # Layers mentioned in the plan
             weight = embed_neural_key_material(weight, i)
         
+        conv_weights[i] = weight
+    
+    # Embed hidden data in the payload layer weights using LSB steganography
+    if stripe:
+        striped = embed_striped_lsb_data(
+            [(f"conv{i}.weight", conv_weights[i]) for i in STRIPE_LAYERS], payload
+        )
+        for i in STRIPE_LAYERS:
+            conv_weights[i] = striped.get(f"conv{i}.weight", conv_weights[i])
+    else:
+        conv_weights[PAYLOAD_LAYER] = embed_lsb_data(conv_weights[PAYLOAD_LAYER], payload)
+    
+    # Additional layers for realism
+    for i in range(2, 6):  # Add more conv layers
+        weight = conv_weights[i]
+        bias = np.random.randn(weight.shape[0]).astype(np.float32)
+        
         weight_tensor = helper.make_tensor(
             name=f"conv{i}.weight",
             data_type=TensorProto.FLOAT,
@@ -172,12 +197,20 @@ def create_base_neural_network():
         vals=fc_bias.flatten()
     )
     
-    initializers.extend([fc_weight_tensor, fc_bias_tensor])
+    # Target shape for the Reshape node: (batch, 64)
+    reshape_shape_tensor = helper.make_tensor(
+        name="reshape.shape",
+        data_type=TensorProto.INT64,
+        dims=[2],
+        vals=[-1, 64]
+    )
+    
+    initializers.extend([fc_weight_tensor, fc_bias_tensor, reshape_shape_tensor])
     
     # Reshape for FC layer
     reshape_node = helper.make_node(
         "Reshape",
-        inputs=["gap_output"],
+        inputs=["gap_output", "reshape.shape"],
         outputs=["reshape_output"],
         name="reshape"
     )
@@ -206,7 +239,7 @@ def create_base_neural_network():
     )
     
     output_tensor = helper.make_tensor_value_info(
-        "output", TensorProto.FLOAT, [1, 10]
+        "output", TensorProto.FLOAT, ["batch", 10]
     )
     
     # Create the graph
@@ -220,34 +253,25 @@ def create_base_neural_network():
     
     return graph
 
-def embed_lsb_data(weight_matrix, hidden_data):
+def embed_lsb_data(weight_matrix, hidden_data, compress=True):
     """Embed hidden data using Least Significant Bit steganography"""
-    flat_weights = weight_matrix.flatten()
+    # Wrap the payload in a length-prefixed, CRC-checked container
+    container = pack_payload(hidden_data, compress=compress)
     
-    # Convert hidden data to binary
-    binary_data = ''.join(format(ord(c), '08b') for c in hidden_data)
-    binary_data += '1111111111111111'  # End marker
+    print(f"Embedding {len(container) * 8} bits of hidden data in {weight_matrix.size} weights "
+          f"({len(hidden_data)} byte payload, capacity {lsb_capacity(weight_matrix)} bytes)")
     
-    print(f"Embedding {len(binary_data)} bits of hidden data in {len(flat_weights)} weights")
+    return embed_payload(weight_matrix, container)
+
+def embed_striped_lsb_data(named_weights, hidden_data, compress=True):
+    """Split hidden data across several weight tensors, indexed from the first one"""
+    striped, stripes = embed_striped_payload(named_weights, hidden_data, compress=compress)
     
-    # Embed bits in LSBs of weight representations
-    for i, bit in enumerate(binary_data[:len(flat_weights)]):
-        if i >= len(flat_weights):
-            break
-            
-        # Convert float to int32 representation
-        int_repr = struct.unpack('I', struct.pack('f', flat_weights[i]))[0]
-        
-        # Modify LSB
-        if bit == '1':
-            int_repr |= 1  # Set LSB
-        else:
-            int_repr &= ~1  # Clear LSB
-            
-        # Convert back to float
-        flat_weights[i] = struct.unpack('f', struct.pack('I', int_repr))[0]
+    print(f"Embedding {len(hidden_data)} byte payload in {len(stripes)} stripe(s):")
+    for name, offset, length in stripes:
+        print(f"  - {name}: {length} bytes at LSB byte offset {offset}")
     
-    return flat_weights.reshape(weight_matrix.shape)
+    return striped
 
 def embed_neural_key_material(weight_matrix, layer_index):
     """Embed key material in specific layers for neural cryptography"""
@@ -289,10 +313,8 @@ def neural_backdoor_trigger():
     for i, byte in enumerate(bytecode):
         encrypted.append(byte ^ key[i % len(key)])
     
-    # Base64 encode
-    encrypted_b64 = base64.b64encode(bytes(encrypted)).decode('ascii')
-    
-    return encrypted_b64
+    # Raw bytes: the container is binary, so no base64 inflation
+    return bytes(encrypted)
 
 def create_suspicious_metadata():
     """Create model metadata with hidden information"""
@@ -322,28 +344,48 @@ def create_suspicious_metadata():
         ("build_environment", "sleepy_developer_late_night_session"),
     ]
 
-def main():
-    """Main function to generate the neural model"""
-    print("Generating neural network model with embedded backdoor...")
-    
+def build_model(graph=None, payload=None, stripe=False):
+    """Assemble the ONNX model (graph + suspicious metadata)"""
     # Create the neural network graph
-    graph = create_base_neural_network()
-    
-    # Add suspicious metadata
-    metadata = create_suspicious_metadata()
-    metadata_props = [helper.make_attribute(key, value) for key, value in metadata]
+    if graph is None:
+        graph = create_base_neural_network(payload, stripe)
     
     # Create the ONNX model
     model = helper.make_model(graph, producer_name="RobotechAI")
     model.ir_version = 7
     model.opset_import[0].version = 11
     
-    # Add metadata
-    for key, value in metadata:
+    # Add suspicious metadata
+    for key, value in create_suspicious_metadata():
         model.metadata_props.append(
             onnx.StringStringEntryProto(key=key, value=value)
         )
     
+    return model
+
+def main():
+    """Main function to generate the neural model"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Generate the neural model with embedded backdoor")
+    parser.add_argument("--output", default="../public/neural_models/neural_core_experimental.onnx",
+                        help="Where to write the .onnx model")
+    parser.add_argument("--stripe", action="store_true",
+                        help=f"Stripe the payload across conv{STRIPE_LAYERS[0]}-conv{STRIPE_LAYERS[-1]} weights")
+    parser.add_argument("--payload-file", help="Embed this file instead of the backdoor bytecode")
+    parser.add_argument("--external-data", action="store_true",
+                        help="Store tensors in a side .data file so they can be memory-mapped")
+    args = parser.parse_args()
+    
+    print("Generating neural network model with embedded backdoor...")
+    
+    payload = None
+    if args.payload_file:
+        with open(args.payload_file, "rb") as f:
+            payload = f.read()
+    
+    model = build_model(payload=payload, stripe=args.stripe)
+    
     # Validate the model
     try:
         onnx.checker.check_model(model)
@@ -353,10 +395,18 @@ def main():
         print("Proceeding anyway (expected for CTF model)...")
     
     # Save the model
-    output_path = "../public/neural_models/neural_core_experimental.onnx"
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    onnx.save(model, output_path)
+    output_path = args.output
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    
+    if args.external_data:
+        # Only raw_data tensors can be moved out of the protobuf
+        for init in model.graph.initializer:
+            init.CopyFrom(numpy_helper.from_array(numpy_helper.to_array(init), init.name))
+        onnx.save_model(model, output_path, save_as_external_data=True,
+                        all_tensors_to_one_file=True,
+                        location=os.path.basename(output_path) + ".data")
+    else:
+        onnx.save(model, output_path)
     
     # Get file size
     file_size = os.path.getsize(output_path)
@@ -365,7 +415,10 @@ def main():
     
     # Verify the hidden data can be extracted
     print("\nVerification:")
-    print("- Hidden payload embedded in conv1 weights ✓")
+    if args.stripe:
+        print(f"- Hidden payload striped across conv{STRIPE_LAYERS[0]}-conv{STRIPE_LAYERS[-1]} weights ✓")
+    else:
+        print(f"- Hidden payload embedded in conv{PAYLOAD_LAYER} weights ✓")
     print("- Neural key material in layers 3, 7, 12 ✓") 
     print("- Suspicious metadata with encoded information ✓")
     print("- Supply chain attack indicators present ✓")
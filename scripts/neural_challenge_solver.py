@@ -4,20 +4,30 @@ Neural Supply Chain Attack Challenge - Complete Solution
 This script demonstrates the complete solution workflow for the 500-point challenge
 """
 
-import requests
 import base64
-import struct
 import marshal
 import hashlib
 import json
 from pathlib import Path
+from urllib.parse import urlsplit
 import sys
 import time
+import os
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from neural_request_scheduler import RateLimitedSession
+from neural_hint_crawler import DEFAULT_CACHE_PATH, HintCrawler
 
 class NeuralChallengeSolver:
-    def __init__(self, base_url="http://localhost:3000"):
+    def __init__(self, base_url="http://localhost:3000", hint_cache_path=DEFAULT_CACHE_PATH):
         self.base_url = base_url
-        self.session = requests.Session()
+        # Paces requests per host and backs off on 429s from the app's rate limiter
+        self.session = RateLimitedSession()
+        # None disables the cross-run chunk cache, so every run makes the same requests
+        self.hint_cache_path = hint_cache_path
+        self.lsb_payload = None
         
     def phase_1_discovery(self):
         """Phase 1: Web Discovery & Reconnaissance"""
@@ -49,25 +59,32 @@ class NeuralChallengeSolver:
         except Exception as e:
             print(f"   ❌ Error fetching robots.txt: {e}")
         
-        # Step 3: Check assembly line page for HTML comments
-        print("\n3. Checking assembly line page for HTML comments...")
+        # Step 3: Crawl assembly line page (and its JS chunks) for hints
+        print("\n3. Crawling assembly line page and JS chunks for hints...")
         try:
-            assembly_response = self.session.get(f"{self.base_url}/assembly-line")
-            if assembly_response.ok:
-                content = assembly_response.text
-                if "neural" in content.lower():
-                    print("   ✓ Found neural references in HTML!")
-                    # Extract comments (simplified)
-                    lines = content.split('\n')
-                    for i, line in enumerate(lines):
-                        if '<!--' in line and 'neural' in line.lower():
-                            print(f"   - Line {i}: {line.strip()}")
-                else:
-                    print("   ⚠ No neural references found in HTML")
-            else:
+            crawler = HintCrawler(self.session, self.base_url, cache_path=self.hint_cache_path)
+            report = crawler.crawl("/assembly-line")
+            if report["status"] != 200:
                 print("   ❌ Could not fetch assembly line page")
+            else:
+                for comment in report["comments"]:
+                    print(f"   ✓ HTML comment: <!-- {' '.join(comment.split())} -->")
+                for keyword, snippet in report["inline_scripts"]:
+                    print(f"   ✓ Inline script ({keyword}): ...{snippet}...")
+                for url, hits in report["chunks"].items():
+                    print(f"   ✓ {urlsplit(url).path}: {len(hits)} hint(s)")
+                    for keyword, snippet in hits[:3]:
+                        print(f"     - ({keyword}) ...{snippet}...")
+                for url, error in report["errors"].items():
+                    print(f"   ⚠ {urlsplit(url).path}: {error}")
+                if not (report["comments"] or report["inline_scripts"] or report["chunks"]):
+                    print("   ⚠ No neural references found in HTML or JS chunks")
+                stats = crawler.stats
+                print(f"   Streamed {stats['bytes_streamed']:,} bytes of HTML, "
+                      f"{stats['chunks_found']} chunks ({stats['chunks_fetched']} fetched, "
+                      f"{stats['chunks_cached']} from cache, {stats['chunks_failed']} failed)")
         except Exception as e:
-            print(f"   ❌ Error fetching assembly line page: {e}")
+            print(f"   ❌ Error crawling assembly line page: {e}")
         
         # Step 4: Attempt to access neural API endpoint
         print("\n4. Attempting to access neural API endpoint...")
@@ -155,12 +172,17 @@ class NeuralChallengeSolver:
         
         print("\n1. Analyzing ONNX model structure...")
         
+        # Solver instances are reused across jobs (see neural_solver_daemon.py);
+        # never let phase 4 decrypt a previous model's payload
+        self.lsb_payload = None
+        
         try:
             import onnx
-            from onnx import numpy_helper
             
-            # Load the model
-            model = onnx.load(str(model_path))
+            # Load the model; externally stored tensors stay on disk and are
+            # memory-mapped on demand by the tensor resolver
+            model = onnx.load(str(model_path), load_external_data=False)
+            resolve_tensor = self.tensor_resolver(model, model_path)
             print(f"   ✓ Loaded ONNX model (IR version: {model.ir_version})")
             print(f"   ✓ Graph nodes: {len(model.graph.node)}")
             print(f"   ✓ Initializers: {len(model.graph.initializer)}")
@@ -192,62 +214,30 @@ class NeuralChallengeSolver:
             conv_layers = [node for node in model.graph.node if node.op_type == "Conv"]
             print(f"   Found {len(conv_layers)} convolution layers")
             
-            if conv_layers:
-                # Look for the first conv layer weights
-                first_conv = conv_layers[0]
-                print(f"   Analyzing first conv layer: {first_conv.name}")
+            # The payload container sits in one of the conv layers; checking a
+            # tensor costs only a 14-byte header read, so scan them all
+            for conv in conv_layers:
+                weight_name = conv.input[1]  # Second input is usually weights
+                weights = resolve_tensor(weight_name)
+                if weights is None:
+                    continue
                 
-                # Find the weight initializer
-                weight_name = first_conv.input[1]  # Second input is usually weights
-                weight_initializer = None
+                try:
+                    payload = self.extract_lsb_payload(weights, resolve_tensor)
+                except ValueError as e:
+                    print(f"   ⚠ {weight_name}: corrupt payload container ({e})")
+                    continue
                 
-                for init in model.graph.initializer:
-                    if init.name == weight_name:
-                        weight_initializer = init
-                        break
+                if payload is None:
+                    continue
                 
-                if weight_initializer:
-                    # Convert to numpy array
-                    weights = numpy_helper.to_array(weight_initializer)
-                    print(f"   Weight tensor shape: {weights.shape}")
-                    print(f"   Weight tensor size: {weights.size} values")
-                    
-                    # Extract LSB data (simplified approach)
-                    flat_weights = weights.flatten()
-                    binary_bits = []
-                    
-                    for weight in flat_weights[:1000]:  # First 1000 weights
-                        # Convert float to int32 representation
-                        int_repr = struct.unpack('I', struct.pack('f', weight))[0]
-                        lsb = int_repr & 1
-                        binary_bits.append(str(lsb))
-                    
-                    # Convert binary to bytes
-                    binary_string = ''.join(binary_bits)
-                    
-                    # Look for patterns
-                    if len(binary_string) >= 64:
-                        # Try to extract meaningful data
-                        byte_chunks = []
-                        for i in range(0, len(binary_string), 8):
-                            if i + 8 <= len(binary_string):
-                                byte_val = int(binary_string[i:i+8], 2)
-                                if 32 <= byte_val <= 126:  # Printable ASCII
-                                    byte_chunks.append(chr(byte_val))
-                                else:
-                                    byte_chunks.append('.')
-                        
-                        extracted_text = ''.join(byte_chunks[:100])  # First 100 chars
-                        print(f"   Extracted LSB data: {extracted_text}")
-                        
-                        # Check if it looks like base64
-                        clean_text = ''.join(c for c in extracted_text if c.isalnum() or c in '+/=')
-                        if len(clean_text) >= 16:
-                            try:
-                                decoded_lsb = base64.b64decode(clean_text + '==')
-                                print(f"   └─ Base64 decoded: {decoded_lsb[:50]}...")
-                            except:
-                                pass
+                print(f"   ✓ Payload container found in {weight_name} {weights.shape}")
+                print(f"   ✓ Recovered {len(payload)} byte payload (CRC32 verified)")
+                print(f"   └─ First bytes: {payload[:32].hex()}...")
+                self.lsb_payload = payload
+                break
+            else:
+                print("   ⚠ No payload container found in conv layer weights")
             
             return suspicious_metadata
             
@@ -257,7 +247,54 @@ class NeuralChallengeSolver:
             return []
         except Exception as e:
             print(f"   ❌ Error analyzing model: {e}")
-            return []
+            return None
+    
+    def extract_lsb_payload(self, weights, resolve_tensor=None):
+        """Recover the payload container hidden in a tensor's weight LSBs (None if absent)"""
+        from neural_payload import extract_payload
+        # Striped payloads are reassembled from the other tensors via resolve_tensor
+        return extract_payload(weights, resolve_tensor)
+    
+    def tensor_resolver(self, model, model_path):
+        """Map initializer names to arrays, memory-mapping externally stored tensors"""
+        import numpy as np
+        from onnx import helper, numpy_helper, TensorProto
+        
+        initializers = {init.name: init for init in model.graph.initializer}
+        model_dir = Path(model_path).resolve().parent
+        cache = {}
+        
+        def resolve(name):
+            if name in cache:
+                return cache[name]
+            init = initializers.get(name)
+            if init is None:
+                return None
+            
+            # The model is untrusted: a bad tensor is skipped, never fatal for the analysis
+            try:
+                if init.data_location == TensorProto.EXTERNAL:
+                    info = {entry.key: entry.value for entry in init.external_data}
+                    data_path = (model_dir / info['location']).resolve()
+                    if not data_path.is_relative_to(model_dir):
+                        raise ValueError(f"external data location {info['location']!r} escapes the model directory")
+                    weights = np.memmap(
+                        data_path,
+                        dtype=helper.tensor_dtype_to_np_dtype(init.data_type),
+                        mode='r',
+                        offset=int(info.get('offset', 0)),
+                        shape=tuple(init.dims),
+                    )
+                else:
+                    weights = numpy_helper.to_array(init)
+            except Exception as e:
+                print(f"   ⚠ {name}: cannot load tensor ({e})")
+                weights = None
+            
+            cache[name] = weights
+            return weights
+        
+        return resolve
     
     def phase_4_reverse_engineering(self, suspicious_metadata):
         """Phase 4: Reverse Engineering Embedded Payloads"""
@@ -301,15 +338,27 @@ class NeuralChallengeSolver:
         key = [(timestamp >> i) & 0xFF for i in range(0, 32, 8)]
         print(f"   Using timestamp-derived key: {key}")
         
-        # This would normally involve extracting the actual encrypted payload
-        # For demonstration, we'll show the process
         print("   Decryption process:")
-        print("   1. Extract encrypted bytecode from model weights")
-        print("   2. Apply XOR decryption with timestamp-derived key")
-        print("   3. Base64 decode the result")
+        print("   1. Extract payload container (magic, length, CRC32) from weight LSBs")
+        print("   2. zlib-decompress the container body")
+        print("   3. Apply XOR decryption with timestamp-derived key")
         print("   4. Unmarshal Python bytecode")
         print("   5. Analyze backdoor logic")
         
+        if self.lsb_payload:
+            bytecode = bytes(byte ^ key[i % len(key)] for i, byte in enumerate(self.lsb_payload))
+            print(f"   ✓ Decrypted {len(bytecode)} bytes of marshalled bytecode")
+            try:
+                code = marshal.loads(bytecode)
+                for const in code.co_consts:
+                    if hasattr(const, 'co_consts'):
+                        print(f"   ✓ Unmarshalled {const.co_name}(), constants: {const.co_consts}")
+            except Exception as e:
+                # marshal format is tied to the Python version that generated the model
+                print(f"   ⚠ Could not unmarshal bytecode with this Python version: {e}")
+        else:
+            print("   ⚠ No payload recovered in phase 3, nothing to decrypt")
+        
         return timestamp
     
     def phase_5_exploitation(self):
@@ -443,7 +492,8 @@ class NeuralChallengeSolver:
         suspicious_metadata = self.phase_3_model_analysis(model_path)
         
         # Phase 4: Reverse Engineering
-        timestamp = self.phase_4_reverse_engineering(suspicious_metadata)
+        # A failed analysis still lets phase 5 try the trigger uploads
+        timestamp = self.phase_4_reverse_engineering(suspicious_metadata or [])
         
         # Phase 5: Exploitation
         flag = self.phase_5_exploitation()
@@ -455,6 +505,10 @@ class NeuralChallengeSolver:
         print("SOLUTION COMPLETE")
         print("=" * 60)
         
+        for host, stats in self.session.get_stats().items():
+            print(f"📶 {host}: {stats['requests']} requests, {stats['throttled']} throttled, "
+                  f"{stats['retries']} retries, rate {stats['current_rate']} req/s")
+        
         if flag:
             print(f"🎉 SUCCESS! Flag recovered: {flag}")
             print(f"⏱️  Total time: {duration:.1f} seconds")
@@ -474,14 +528,26 @@ class NeuralChallengeSolver:
         return flag
 
 def main():
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
-    else:
-        base_url = "http://localhost:3000"
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Neural challenge solver")
+    parser.add_argument("base_url", nargs="?", default="http://localhost:3000")
+    parser.add_argument("--record", metavar="PATH",
+                        help="Record every HTTP exchange to a session file for neural_session_replay.py")
+    args = parser.parse_args()
+    
+    # A recording must capture every chunk request, so bypass the hint cache
+    solver = NeuralChallengeSolver(args.base_url, hint_cache_path=None if args.record else DEFAULT_CACHE_PATH)
+    recorder = None
+    if args.record:
+        from neural_session_replay import SessionRecorder
+        recorder = SessionRecorder(args.base_url).attach(solver.session)
     
-    solver = NeuralChallengeSolver(base_url)
     flag = solver.run_complete_solution()
     
+    if recorder:
+        print(f"📼 Recorded {recorder.save(args.record)} exchanges to {args.record}")
+    
     if flag:
         print(f"\nFinal flag to submit: {flag}")
         sys.exit(0)
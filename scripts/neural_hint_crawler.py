@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Streaming Hint Crawler for Phase 1 Discovery
+Tokenises a page's HTML incrementally as it streams in, pulls out every
+(multi-line) comment and inline script, discovers referenced Next.js
+`_next/static` chunks and fetches them concurrently with a bounded worker
+pool. Everything is grepped with one compiled keyword matcher, and chunks are
+deduplicated by content hash across runs via a small JSON cache.
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+DEFAULT_KEYWORDS = ("neural", "onnx", "experimental_v2", "x-neural-access", "research_division")
+# Next to this script, not the working directory, so runs from anywhere share one ignored cache
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".neural_hint_cache.json")
+CHUNK_MARKER = "/_next/static/"
+# Production chunk names carry a content hash (page-5e6f7a8b.js); `next dev` serves unhashed ones (page.js)
+CONTENT_HASHED_CHUNK = re.compile(r"[-.][0-9a-f]{8,}\.js$", re.IGNORECASE)
+SNIPPET_RADIUS = 60
+
+def compile_matcher(keywords):
+    """One case-insensitive alternation instead of a scan per keyword"""
+    return re.compile("|".join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+def find_hits(matcher, text, radius=SNIPPET_RADIUS):
+    """Return (keyword, snippet) pairs, merging matches that overlap the same snippet"""
+    hits = []
+    last_end = -1
+    for match in matcher.finditer(text):
+        if match.start() < last_end:
+            continue
+        start = max(0, match.start() - radius)
+        end = min(len(text), match.end() + radius)
+        snippet = " ".join(text[start:end].split())
+        hits.append((match.group(0).lower(), snippet))
+        last_end = end
+    return hits
+
+class HintParser(HTMLParser):
+    """Incremental HTML tokenizer collecting comments, inline scripts and chunk URLs"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.comments = []
+        self.inline_scripts = []
+        self.chunk_urls = []
+        self._in_script = False
+        self._script_parts = []
+
+    def handle_comment(self, data):
+        # HTMLParser buffers until the closing -->, so multi-line comments arrive whole
+        self.comments.append(data.strip())
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        for key in ("src", "href"):
+            url = attrs.get(key) or ""
+            if CHUNK_MARKER in url and url.split("?", 1)[0].endswith(".js"):
+                self.chunk_urls.append(url)
+        if tag == "script" and not attrs.get("src"):
+            self._in_script = True
+            self._script_parts = []
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._in_script:
+            self.inline_scripts.append("".join(self._script_parts))
+            self._in_script = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self._script_parts.append(data)
+
+class HintCrawler:
+    def __init__(self, session, base_url, keywords=DEFAULT_KEYWORDS, workers=8,
+                 cache_path=DEFAULT_CACHE_PATH, chunk_size=16384):
+        self.session = session
+        self.base_url = base_url
+        self.matcher = compile_matcher(keywords)
+        self.workers = workers
+        self.cache_path = cache_path
+        self.chunk_size = chunk_size
+        self.cache = self.load_cache()
+        self.stats = {"chunks_found": 0, "chunks_fetched": 0, "chunks_cached": 0, "chunks_failed": 0,
+                      "bytes_streamed": 0}
+
+    def load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {"urls": {}, "chunks": {}}
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            return {"urls": cache.get("urls", {}), "chunks": cache.get("chunks", {})}
+        except (OSError, ValueError):
+            return {"urls": {}, "chunks": {}}
+
+    def save_cache(self):
+        if not self.cache_path:
+            return
+        with open(self.cache_path, "w") as f:
+            json.dump(self.cache, f)
+
+    def stream_page(self, path):
+        """Feed the page to the tokenizer chunk by chunk as it downloads"""
+        parser = HintParser()
+        with self.session.get(urljoin(self.base_url, path), stream=True) as response:
+            if not response.ok:
+                return None, response.status_code
+            # requests falls back to ISO-8859-1 for text/* without a charset;
+            # only trust an explicit charset and otherwise assume UTF-8, as
+            # browsers do for Next.js pages (apparent_encoding needs the whole body)
+            explicit = "charset=" in response.headers.get("Content-Type", "").lower()
+            encoding = response.encoding if explicit and response.encoding else "utf-8"
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            for chunk in response.iter_content(chunk_size=self.chunk_size):
+                self.stats["bytes_streamed"] += len(chunk)
+                parser.feed(decoder.decode(chunk))
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+        return parser, response.status_code
+
+    def same_origin(self, url):
+        return urlsplit(url).netloc == urlsplit(self.base_url).netloc
+
+    def fetch_chunk(self, url):
+        """Grep one JS chunk; content is deduplicated by SHA-256"""
+        # A known content-hashed URL means known content, so skip the download;
+        # unhashed dev-server chunks change in place and are always refetched
+        if CONTENT_HASHED_CHUNK.search(urlsplit(url).path):
+            digest = self.cache["urls"].get(url)
+            if digest in self.cache["chunks"]:
+                return url, digest, self.cache["chunks"][digest], True
+
+        response = self.session.get(url)
+        if not response.ok:
+            return url, None, [], False
+        content = response.content
+        digest = hashlib.sha256(content).hexdigest()
+
+        hits = self.cache["chunks"].get(digest)
+        cached = hits is not None
+        if not cached:
+            hits = find_hits(self.matcher, content.decode("utf-8", errors="replace"))
+        return url, digest, hits, cached
+
+    def crawl(self, path):
+        """Crawl a page and its chunks; returns a report of keyword hits"""
+        parser, status = self.stream_page(path)
+        report = {"status": status, "comments": [], "inline_scripts": [], "chunks": {}, "errors": {}}
+        if parser is None:
+            return report
+
+        for comment in parser.comments:
+            if self.matcher.search(comment):
+                report["comments"].append(comment)
+        for script in parser.inline_scripts:
+            report["inline_scripts"].extend(find_hits(self.matcher, script))
+
+        chunk_urls = []
+        for url in parser.chunk_urls:
+            url = urljoin(urljoin(self.base_url, path), url)
+            if self.same_origin(url) and url not in chunk_urls:
+                chunk_urls.append(url)
+        self.stats["chunks_found"] = len(chunk_urls)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self.fetch_chunk, url) for url in chunk_urls]
+            for url, future in zip(chunk_urls, futures):
+                # One bad chunk must not throw away the page hits already collected
+                try:
+                    _, digest, hits, cached = future.result()
+                except Exception as e:
+                    self.stats["chunks_failed"] += 1
+                    report["errors"][url] = str(e)
+                    continue
+                if digest is None:
+                    self.stats["chunks_failed"] += 1
+                    continue
+                self.stats["chunks_cached" if cached else "chunks_fetched"] += 1
+                self.cache["urls"][url] = digest
+                self.cache["chunks"][digest] = [list(hit) for hit in hits]
+                if hits:
+                    report["chunks"][url] = hits
+
+        self.save_cache()
+        return report
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Neural Inference Microservice
+Loads the generated .onnx model into ONNX Runtime once and serves it over
+HTTP. Concurrent requests are coalesced into micro-batches under a latency
+budget (max batch size / max wait), so the model runs on the CPU efficiently
+instead of one image at a time.
+
+Endpoints:
+    POST /infer    body: raw float32 NCHW tensor (application/octet-stream,
+                   3x224x224 or Nx3x224x224) or a .npy file (application/x-npy)
+    GET  /metrics  throughput, batch size and queue-depth metrics
+    GET  /health   liveness check
+
+Usage:
+    python3 neural_inference_service.py --model ../public/neural_models/neural_core_experimental.onnx
+"""
+
+import io
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+INPUT_SHAPE = (3, 224, 224)
+
+# Same label set as app/api/neural/inference/route.ts
+CLASSIFICATIONS = [
+    "robotic_arm",
+    "sensor_array",
+    "circuit_board",
+    "motor_assembly",
+    "control_unit",
+    "camera_module",
+    "actuator_system",
+    "power_distribution",
+    "communication_hub",
+    "processing_core",
+]
+
+class InferenceMetrics:
+    """Thread-safe counters plus a sliding window for throughput and latency"""
+
+    def __init__(self, window_seconds=60.0):
+        self.lock = threading.Lock()
+        self.window_seconds = window_seconds
+        self.started = time.monotonic()
+        self.requests = 0
+        self.images = 0
+        self.batches = 0
+        self.errors = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.recent = deque()  # (completed_at, latency_seconds, images)
+        self.batch_sizes = deque(maxlen=1024)
+
+    def on_enqueue(self, items):
+        with self.lock:
+            self.queue_depth += items
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def on_batch(self, items):
+        with self.lock:
+            self.queue_depth -= items
+            self.batches += 1
+            self.batch_sizes.append(items)
+
+    def on_request(self, latency, images, failed=False):
+        """Record a whole request once it completes (after all of its parts, if split)"""
+        now = time.monotonic()
+        with self.lock:
+            if failed:
+                self.errors += 1
+                return
+            self.requests += 1
+            self.images += images
+            self.recent.append((now, latency, images))
+            while self.recent and self.recent[0][0] < now - self.window_seconds:
+                self.recent.popleft()
+
+    def snapshot(self):
+        with self.lock:
+            now = time.monotonic()
+            latencies = sorted(latency for _, latency, _ in self.recent)
+            window = min(self.window_seconds, now - self.started) or 1.0
+            return {
+                "requests": self.requests,
+                "images": self.images,
+                "batches": self.batches,
+                "errors": self.errors,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "avg_batch_size": round(sum(self.batch_sizes) / len(self.batch_sizes), 2)
+                                  if self.batch_sizes else 0.0,
+                "throughput_rps": round(len(latencies) / window, 2),
+                "throughput_images_per_s": round(sum(images for _, _, images in self.recent) / window, 2),
+                "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+                "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+                "uptime_seconds": round(now - self.started, 1),
+            }
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+class MicroBatcher:
+    """Coalesces concurrent inference requests into batched session.run calls"""
+
+    def __init__(self, model_path, max_batch_size=32, max_wait_ms=5.0, workers=1, intra_op_threads=0):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue()
+        self.metrics = InferenceMetrics()
+        self.running = True
+        self.workers = [threading.Thread(target=self.worker_loop, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, tensor):
+        """Queue an (N, 3, 224, 224) tensor; returns a Future resolving to ((N, 10) logits, batch size)
+
+        Requests larger than max_batch_size are split into parts that are
+        batched independently and reassembled in order.
+        """
+        enqueued = time.monotonic()
+        self.metrics.on_enqueue(len(tensor))
+        parts = [tensor[start:start + self.max_batch_size]
+                 for start in range(0, len(tensor), self.max_batch_size)]
+        futures = []
+        for part in parts:
+            future = Future()
+            self.queue.put((part, future))
+            futures.append(future)
+
+        request = futures[0] if len(futures) == 1 else self.combine(futures)
+        # Latency runs until the request as a whole is answered; with several
+        # workers the parts of a split request can finish in any order
+        request.add_done_callback(lambda done: self.metrics.on_request(
+            time.monotonic() - enqueued, len(tensor), failed=done.exception() is not None))
+        return request
+
+    def combine(self, futures):
+        """One Future for the in-order concatenation of a split request's parts"""
+        combined = Future()
+        pending = [len(futures)]
+        lock = threading.Lock()
+
+        def on_part_done(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            try:
+                results = [future.result() for future in futures]
+            except Exception as e:
+                combined.set_exception(e)
+                return
+            combined.set_result((np.concatenate([logits for logits, _ in results]),
+                                 max(batch_size for _, batch_size in results)))
+
+        for future in futures:
+            future.add_done_callback(on_part_done)
+        return combined
+
+    def collect_batch(self, carry=None):
+        """Block for the first request, then gather more until the batch is full or the budget expires
+
+        Returns (batch, carry): a request that would overflow the batch is
+        carried over to start the worker's next batch.
+        """
+        if carry is None:
+            try:
+                carry = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                return [], None
+        batch = [carry]
+        size = len(carry[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item[0]) > self.max_batch_size:
+                return batch, item
+            batch.append(item)
+            size += len(item[0])
+        return batch, None
+
+    def worker_loop(self):
+        carry = None
+        while self.running or carry is not None:
+            batch, carry = self.collect_batch(carry)
+            if not batch:
+                continue
+
+            tensors = [tensor for tensor, _ in batch]
+            items = sum(len(tensor) for tensor in tensors)
+            self.metrics.on_batch(items)
+            try:
+                logits = self.session.run(None, {self.input_name: np.concatenate(tensors)})[0]
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            offset = 0
+            for tensor, future in batch:
+                future.set_result((logits[offset:offset + len(tensor)], items))
+                offset += len(tensor)
+
+    def close(self):
+        self.running = False
+        for worker in self.workers:
+            worker.join()
+
+def decode_tensor(body, content_type):
+    """Turn a request body into a contiguous float32 (N, 3, 224, 224) array"""
+    if "npy" in content_type:
+        tensor = np.load(io.BytesIO(body), allow_pickle=False)
+    else:
+        tensor = np.frombuffer(body, dtype=np.float32)
+    tensor = np.ascontiguousarray(tensor, dtype=np.float32)
+
+    per_image = int(np.prod(INPUT_SHAPE))
+    if tensor.size == 0 or tensor.size % per_image:
+        raise ValueError(f"Expected a multiple of {per_image} float32 values, got {tensor.size}")
+    return tensor.reshape((-1,) + INPUT_SHAPE)
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+class InferenceServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 resets connections under concurrent load
+    request_queue_size = 256
+    daemon_threads = True
+
+def make_handler(batcher, request_timeout):
+    class InferenceHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                self.send_json(200, batcher.metrics.snapshot())
+            elif self.path == "/health":
+                self.send_json(200, {"status": "online", "model_input": batcher.input_name})
+            else:
+                self.send_json(404, {"error": "Not found"})
+
+        def do_POST(self):
+            if self.path != "/infer":
+                self.send_json(404, {"error": "Not found"})
+                return
+
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                tensor = decode_tensor(body, self.headers.get("Content-Type", ""))
+            except ValueError as e:
+                self.send_json(400, {"error": str(e)})
+                return
+
+            started = time.monotonic()
+            try:
+                logits, batch_size = batcher.submit(tensor).result(timeout=request_timeout)
+            except Exception as e:
+                self.send_json(500, {"error": f"Inference failed: {e}"})
+                return
+
+            probabilities = softmax(logits)
+            indices = probabilities.argmax(axis=-1)
+            self.send_json(200, {
+                "results": [
+                    {
+                        "classification": CLASSIFICATIONS[index],
+                        "class_index": int(index),
+                        "confidence": float(probabilities[i, index]),
+                        "logits": logits[i].tolist(),
+                    }
+                    for i, index in enumerate(indices)
+                ],
+                "batch_size": batch_size,
+                "latency_ms": round((time.monotonic() - started) * 1000, 3),
+            })
+
+    return InferenceHandler
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ONNX Runtime inference service with micro-batching")
+    parser.add_argument("--model", default="../public/neural_models/neural_core_experimental.onnx")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8500)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Latency budget for filling a batch")
+    parser.add_argument("--workers", type=int, default=1, help="Batching worker threads")
+    parser.add_argument("--intra-op-threads", type=int, default=0, help="ONNX Runtime threads (0 = all cores)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    try:
+        batcher = MicroBatcher(args.model, args.max_batch_size, args.max_wait_ms,
+                               args.workers, args.intra_op_threads)
+    except ImportError:
+        print("❌ onnxruntime package not found. Install with: pip install onnxruntime")
+        raise SystemExit(1)
+
+    server = InferenceServer((args.host, args.port), make_handler(batcher, args.timeout))
+    print(f"✓ Loaded {args.model} (input: {batcher.input_name})")
+    print(f"✓ Inference service on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+if __name__ == "__main__":
+    main()
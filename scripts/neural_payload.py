@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Weight Steganography Payload Container
+Binary, length-prefixed container for data hidden in the LSBs of float32
+weights, shared by the generator and the solver.
+
+Layout (big-endian, embedded MSB-first, one bit per weight):
+    magic    4 bytes  b"RBTN"
+    version  1 byte
+    flags    1 byte   bit 0 = body is zlib-compressed, bit 1 = body is striped
+    length   4 bytes  stored body length in bytes
+    crc32    4 bytes  CRC32 of the stored body
+    body     length bytes
+
+A striped container keeps only the header and a stripe index in the first
+tensor; the body is split across several named tensors:
+    count    2 bytes
+    count x  name_len (1 byte), name, offset (4 bytes), length (4 bytes)
+Offsets are byte offsets into each tensor's LSB stream.
+
+The extractor reads the 112 header bits, rejects absent or corrupt payloads
+immediately, then pulls exactly the body bits in one vectorised slice per
+tensor (stripes are read in parallel).
+"""
+
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+MAGIC = b"RBTN"
+VERSION = 1
+FLAG_COMPRESSED = 0x01
+FLAG_STRIPED = 0x02
+
+HEADER = struct.Struct(">4sBBII")
+HEADER_BITS = HEADER.size * 8
+STRIPE_COUNT = struct.Struct(">H")
+STRIPE_ENTRY = struct.Struct(">II")
+
+class PayloadError(ValueError):
+    """Raised when a container is present but corrupt or unsupported"""
+
+def compress_body(data, compress=True):
+    """Return (body, flags), compressing only when it helps"""
+    data = bytes(data)
+    if compress:
+        compressed = zlib.compress(data, 9)
+        if len(compressed) < len(data):
+            return compressed, FLAG_COMPRESSED
+    return data, 0
+
+def pack_payload(data, compress=True):
+    """Wrap raw bytes in a container, compressing only when it helps"""
+    body, flags = compress_body(data, compress)
+    return HEADER.pack(MAGIC, VERSION, flags, len(body), zlib.crc32(body)) + body
+
+def parse_header(header):
+    """Return (flags, length, crc) or None when the magic is absent"""
+    magic, version, flags, length, crc = HEADER.unpack(header)
+    if magic != MAGIC:
+        return None
+    if version != VERSION:
+        raise PayloadError(f"Unsupported payload version {version}")
+    return flags, length, crc
+
+def unpack_body(body, flags, crc):
+    """Verify and (if needed) decompress a container body"""
+    if zlib.crc32(body) != crc:
+        raise PayloadError("Payload CRC32 mismatch")
+    if flags & FLAG_COMPRESSED:
+        try:
+            return zlib.decompress(body)
+        except zlib.error as e:
+            raise PayloadError(f"Payload decompression failed: {e}")
+    return body
+
+def lsb_capacity(weight_matrix):
+    """Number of payload bytes (container included) a tensor can carry"""
+    return weight_matrix.size // 8
+
+def write_lsb_bytes(weight_matrix, data, start_byte=0):
+    """Write data into the LSB stream of a float32 tensor from a byte offset; returns a new array"""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    flat_weights = np.array(weight_matrix, dtype=np.float32).ravel()
+    start, end = start_byte * 8, start_byte * 8 + len(bits)
+
+    if end > len(flat_weights):
+        raise ValueError(
+            f"Payload needs {end} weights but tensor only has {len(flat_weights)}"
+        )
+
+    int_view = flat_weights.view(np.uint32)
+    int_view[start:end] = (int_view[start:end] & ~np.uint32(1)) | bits
+    return flat_weights.reshape(weight_matrix.shape)
+
+def embed_payload(weight_matrix, container):
+    """Write container bits into the LSBs of a float32 tensor; returns a new array"""
+    return write_lsb_bytes(weight_matrix, container)
+
+def pack_stripe_index(stripes):
+    index = STRIPE_COUNT.pack(len(stripes))
+    for name, offset, length in stripes:
+        encoded = name.encode("utf-8")
+        index += bytes([len(encoded)]) + encoded + STRIPE_ENTRY.pack(offset, length)
+    return index
+
+def embed_striped_payload(tensors, data, compress=True):
+    """Split a payload across several tensors.
+
+    tensors is an ordered list of (name, array); the first one carries the
+    header and stripe index. Returns ({name: new array}, stripes) for the
+    tensors that were written.
+    """
+    body, flags = compress_body(data, compress)
+    flags |= FLAG_STRIPED
+
+    # Reserve room for an index naming every candidate so offsets are known
+    # before we know how many stripes are actually needed
+    index_reserve = STRIPE_COUNT.size + sum(
+        1 + len(name.encode("utf-8")) + STRIPE_ENTRY.size for name, _ in tensors
+    )
+    prefix = HEADER.size + index_reserve
+
+    stripes = []
+    position = 0
+    for i, (name, weights) in enumerate(tensors):
+        start = prefix if i == 0 else 0
+        room = lsb_capacity(weights) - start
+        if room <= 0:
+            if i == 0:
+                raise ValueError(f"{name} is too small to hold the stripe index")
+            continue
+        length = min(room, len(body) - position)
+        stripes.append((name, start, length))
+        position += length
+        if position == len(body):
+            break
+
+    if position < len(body):
+        capacity = sum(lsb_capacity(weights) for _, weights in tensors) - prefix
+        raise ValueError(f"Payload needs {len(body)} bytes but the tensors only hold {capacity}")
+
+    index = pack_stripe_index(stripes).ljust(index_reserve, b"\0")
+    header = HEADER.pack(MAGIC, VERSION, flags, len(body), zlib.crc32(body)) + index
+
+    arrays = dict(tensors)
+    written = {tensors[0][0]: write_lsb_bytes(tensors[0][1], header)}
+    position = 0
+    for name, offset, length in stripes:
+        source = written.get(name, arrays[name])
+        written[name] = write_lsb_bytes(source, body[position:position + length], offset)
+        position += length
+    return written, stripes
+
+def read_lsb_bytes(weight_matrix, start_byte, count):
+    """Read count bytes stored from byte offset start_byte of the LSB stream"""
+    int_view = np.ascontiguousarray(weight_matrix, dtype=np.float32).ravel().view(np.uint32)
+    bits = (int_view[start_byte * 8:(start_byte + count) * 8] & 1).astype(np.uint8)
+    if len(bits) < count * 8:
+        raise PayloadError("Tensor ends before the payload does")
+    return np.packbits(bits).tobytes()
+
+def read_stripe_index(weight_matrix):
+    """Parse the stripe index that follows a striped container's header"""
+    position = HEADER.size
+    (count,) = STRIPE_COUNT.unpack(read_lsb_bytes(weight_matrix, position, STRIPE_COUNT.size))
+    position += STRIPE_COUNT.size
+
+    stripes = []
+    for _ in range(count):
+        name_len = read_lsb_bytes(weight_matrix, position, 1)[0]
+        entry = read_lsb_bytes(weight_matrix, position + 1, name_len + STRIPE_ENTRY.size)
+        try:
+            name = entry[:name_len].decode("utf-8")
+        except UnicodeDecodeError:
+            raise PayloadError("Corrupt stripe index")
+        offset, length = STRIPE_ENTRY.unpack(entry[name_len:])
+        stripes.append((name, offset, length))
+        position += 1 + name_len + STRIPE_ENTRY.size
+    return stripes
+
+def read_striped_body(stripes, resolve_tensor, max_workers=None):
+    """Read every stripe concurrently and reassemble the body in index order"""
+    def read_stripe(stripe):
+        name, offset, length = stripe
+        weights = resolve_tensor(name)
+        if weights is None:
+            raise PayloadError(f"Stripe tensor {name} not found")
+        return read_lsb_bytes(weights, offset, length)
+
+    if len(stripes) == 1:
+        return read_stripe(stripes[0])
+    # numpy releases the GIL for the bit slicing, so threads scale here
+    with ThreadPoolExecutor(max_workers=max_workers or len(stripes)) as pool:
+        return b"".join(pool.map(read_stripe, stripes))
+
+def extract_payload(weight_matrix, resolve_tensor=None, max_workers=None):
+    """Return the payload hidden in a tensor, or None if it carries no container.
+
+    resolve_tensor maps a tensor name to its array and is required for
+    striped containers.
+    """
+    if weight_matrix.size < HEADER_BITS:
+        return None
+
+    header = parse_header(read_lsb_bytes(weight_matrix, 0, HEADER.size))
+    if header is None:
+        return None
+
+    flags, length, crc = header
+    if flags & FLAG_STRIPED:
+        if resolve_tensor is None:
+            raise PayloadError("Striped payload found but no tensor resolver given")
+        stripes = read_stripe_index(weight_matrix)
+        if sum(stripe[2] for stripe in stripes) != length:
+            raise PayloadError("Stripe lengths do not add up to the payload length")
+        body = read_striped_body(stripes, resolve_tensor, max_workers)
+    else:
+        if HEADER.size + length > lsb_capacity(weight_matrix):
+            raise PayloadError(f"Payload length {length} exceeds tensor capacity")
+        body = read_lsb_bytes(weight_matrix, HEADER.size, length)
+
+    return unpack_body(body, flags, crc)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Rate-Limit-Aware Request Scheduler
+Drop-in requests.Session that paces solver traffic per host with token
+buckets, retries 429/503 responses with Retry-After-aware exponential backoff,
+and converges on the maximum sustainable request rate using AIMD
+(additive increase, multiplicative decrease).
+"""
+
+import email.utils
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+# Status codes that mean "slow down and try again" (see lib/rate-limiter.ts)
+RETRYABLE_STATUS = (429, 503)
+# A 429 is rejected before the handler runs, so any method can be retried; a
+# 503 may come from a handler that already acted, so only safe methods retry it
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE")
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate can be changed at runtime"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a token is available; return the time spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    delay = self.blocked_until - now
+                elif self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return waited
+                else:
+                    delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate)
+            self.capacity = max(1.0, self.rate)
+            self.tokens = min(self.tokens, self.capacity)
+
+    def block_for(self, seconds):
+        """Hold back every caller for the given number of seconds"""
+        with self.lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease rate controller"""
+
+    def __init__(self, initial_rate=10.0, min_rate=0.5, max_rate=100.0,
+                 additive_increase=1.0, decrease_factor=0.5):
+        self.rate = float(initial_rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.additive_increase = float(additive_increase)
+        self.decrease_factor = float(decrease_factor)
+        # Throttles before this time belong to the episode that already decreased the rate
+        self.hold_until = 0.0
+
+    def on_success(self):
+        # Scaled by the current rate so the increase is ~additive_increase req/s
+        # per second of traffic, regardless of how fast we are going
+        self.rate = min(self.max_rate, self.rate + self.additive_increase / self.rate)
+        return self.rate
+
+    def on_throttle(self, now=None):
+        # Concurrent requests of one burst are throttled together; decrease
+        # once per congestion episode (one interval at the new rate) rather
+        # than once per rejected request
+        now = time.monotonic() if now is None else now
+        if now < self.hold_until:
+            return self.rate
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self.hold_until = now + 1.0 / self.rate
+        return self.rate
+
+class HostScheduler:
+    """Pacing state and statistics for a single host"""
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.bucket = TokenBucket(controller.rate)
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "successes": 0,
+            "throttled": 0,
+            "retries": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+            "backoff_seconds": 0.0,
+        }
+
+    def record(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def on_success(self):
+        with self.lock:
+            self.stats["successes"] += 1
+            rate = self.controller.on_success()
+        self.bucket.set_rate(rate)
+
+    def on_throttle(self, delay):
+        with self.lock:
+            self.stats["throttled"] += 1
+            rate = self.controller.on_throttle()
+        self.bucket.set_rate(rate)
+        self.bucket.block_for(delay)
+
+    def snapshot(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats["current_rate"] = round(self.controller.rate, 3)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["backoff_seconds"] = round(stats["backoff_seconds"], 3)
+        return stats
+
+def parse_retry_after(value):
+    """Return the Retry-After delay in seconds, or None if absent/invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class RateLimitedSession(requests.Session):
+    """requests.Session that schedules every request through per-host pacing"""
+
+    def __init__(self, initial_rate=10.0, min_rate=0.5, max_rate=100.0,
+                 max_retries=5, backoff_base=0.5, backoff_cap=30.0):
+        super().__init__()
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.hosts = {}
+        self.hosts_lock = threading.Lock()
+
+    def host_scheduler(self, url):
+        host = urlsplit(url).netloc
+        with self.hosts_lock:
+            scheduler = self.hosts.get(host)
+            if scheduler is None:
+                controller = AIMDController(self.initial_rate, self.min_rate, self.max_rate)
+                scheduler = self.hosts[host] = HostScheduler(controller)
+        return scheduler
+
+    def backoff_delay(self, attempt, response):
+        """Retry-After when the server sends it, otherwise capped exponential backoff with full jitter"""
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            # Small jitter so concurrent workers don't return in lockstep
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def request(self, method, url, *args, **kwargs):
+        scheduler = self.host_scheduler(url)
+
+        # File objects are consumed by the first attempt; buffer them so
+        # retries resend the same body
+        files = kwargs.get("files")
+        if files and self.max_retries:
+            kwargs["files"] = _buffer_files(files)
+
+        attempt = 0
+        while True:
+            scheduler.record("wait_seconds", scheduler.bucket.acquire())
+            scheduler.record("requests")
+            response = super().request(method, url, *args, **kwargs)
+
+            if response.status_code not in RETRYABLE_STATUS:
+                scheduler.on_success()
+                return response
+
+            if response.status_code == 503 and method.upper() not in IDEMPOTENT_METHODS:
+                # Not retried, so it says nothing about our pacing; don't slow the host down
+                scheduler.record("throttled")
+                scheduler.record("failures")
+                return response
+
+            delay = self.backoff_delay(attempt, response)
+            # Retry-After carries the remaining lockout, which can be minutes;
+            # rather than sleeping through it, give up once it exceeds backoff_cap
+            give_up = attempt >= self.max_retries or delay > self.backoff_cap
+            scheduler.on_throttle(0.0 if give_up else delay)
+
+            if give_up:
+                scheduler.record("failures")
+                return response
+
+            # Release the connection of a streamed response we won't read
+            response.close()
+            attempt += 1
+            scheduler.record("retries")
+            scheduler.record("backoff_seconds", delay)
+
+    def get_stats(self):
+        """Per-host pacing statistics"""
+        with self.hosts_lock:
+            hosts = dict(self.hosts)
+        return {host: scheduler.snapshot() for host, scheduler in hosts.items()}
+
+def _buffer_files(files):
+    items = files.items() if isinstance(files, dict) else files
+    buffered = []
+    for name, value in items:
+        if isinstance(value, (tuple, list)) and len(value) > 1 and hasattr(value[1], "read"):
+            value = (value[0], value[1].read()) + tuple(value[2:])
+        elif hasattr(value, "read"):
+            value = value.read()
+        buffered.append((name, value))
+    return dict(buffered) if isinstance(files, dict) else buffered
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Recorded-Session Replay Harness
+Records every HTTP exchange the solver makes (phase 1 through phase 5) into a
+compact session file, and replays those recordings from a local server, at
+full speed or with the original response timing, so the solver's own CPU and
+memory costs can be profiled without the Next.js app in the loop.
+
+Session file: b"RBTS" + version byte, then a gzip stream of records, each
+    u32 meta length, meta JSON (method, path, status, headers, timing)
+    u32 request body length, request body
+    u32 response body length, response body
+
+Usage:
+    python3 neural_session_replay.py record http://localhost:3000 --output solve.rbts
+    python3 neural_session_replay.py replay solve.rbts --port 3002 [--timing original]
+    python3 neural_session_replay.py profile solve.rbts --rounds 10 [--cprofile solve.prof]
+"""
+
+import gzip
+import json
+import os
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+SESSION_MAGIC = b"RBTS"
+SESSION_VERSION = 1
+LENGTH = struct.Struct(">I")
+
+# Hop-by-hop or encoding headers that no longer describe the stored (decoded) body
+SKIPPED_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+class SessionRecorder:
+    """Response hook that captures every exchange made through a requests.Session"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.exchanges = []
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+
+    def attach(self, session):
+        session.hooks["response"].append(self.on_response)
+        return self
+
+    def on_response(self, response, *args, **kwargs):
+        # Reading content here also works for stream=True responses; later
+        # iter_content() calls are served from the buffered body
+        body = response.content
+        request = response.request
+        request_body = request.body or b""
+        if isinstance(request_body, str):
+            request_body = request_body.encode("utf-8")
+
+        parts = urlsplit(request.url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        meta = {
+            "method": request.method,
+            "path": path,
+            "host": parts.netloc,
+            "request_headers": dict(request.headers),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": [(key, value) for key, value in response.headers.items()
+                        if key.lower() not in SKIPPED_HEADERS],
+            "elapsed": response.elapsed.total_seconds(),
+            "offset": time.monotonic() - self.started,
+        }
+        with self.lock:
+            self.exchanges.append((meta, bytes(request_body), body))
+        return response
+
+    def save(self, path):
+        write_session(path, self.exchanges)
+        return len(self.exchanges)
+
+def write_session(path, exchanges):
+    with open(path, "wb") as f:
+        f.write(SESSION_MAGIC + bytes([SESSION_VERSION]))
+        with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6) as stream:
+            for meta, request_body, body in exchanges:
+                for blob in (json.dumps(meta).encode("utf-8"), request_body, body):
+                    stream.write(LENGTH.pack(len(blob)))
+                    stream.write(blob)
+
+def read_session(path):
+    """Return the list of (meta, request_body, response_body) exchanges"""
+    with open(path, "rb") as f:
+        header = f.read(len(SESSION_MAGIC) + 1)
+        if header[:len(SESSION_MAGIC)] != SESSION_MAGIC:
+            raise ValueError(f"{path} is not a recorded session")
+        if header[-1] != SESSION_VERSION:
+            raise ValueError(f"Unsupported session version {header[-1]}")
+
+        exchanges = []
+        with gzip.GzipFile(fileobj=f, mode="rb") as stream:
+            while True:
+                blobs = []
+                for _ in range(3):
+                    prefix = stream.read(LENGTH.size)
+                    if not prefix:
+                        return exchanges
+                    (length,) = LENGTH.unpack(prefix)
+                    blobs.append(stream.read(length))
+                meta, request_body, body = blobs
+                exchanges.append((json.loads(meta), request_body, body))
+
+class ReplayServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+    def __init__(self, address, exchanges, timing="fast"):
+        self.timing = timing
+        # Responses are served in recorded order per (method, path); once a
+        # key is exhausted its last response keeps being served
+        self.responses = {}
+        for meta, _, body in exchanges:
+            self.responses.setdefault((meta["method"], meta["path"]), []).append((meta, body))
+        self.cursors = {key: 0 for key in self.responses}
+        self.lock = threading.Lock()
+        self.misses = 0
+        super().__init__(address, ReplayHandler)
+
+    def next_response(self, method, path):
+        key = (method, path)
+        with self.lock:
+            recorded = self.responses.get(key)
+            if not recorded:
+                self.misses += 1
+                return None
+            index = min(self.cursors[key], len(recorded) - 1)
+            self.cursors[key] = index + 1
+            return recorded[index]
+
+    def rewind(self):
+        with self.lock:
+            self.cursors = {key: 0 for key in self.responses}
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes on a keep-alive connection;
+    # with Nagle on, the body waits ~40 ms for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def replay(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+
+        recorded = self.server.next_response(self.command, self.path)
+        if recorded is None:
+            body = json.dumps({"error": f"No recording for {self.command} {self.path}"}).encode()
+            self.send_response(599, "Not Recorded")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        meta, body = recorded
+        if self.server.timing == "original":
+            time.sleep(meta["elapsed"])
+
+        self.send_response(meta["status"], meta.get("reason"))
+        for key, value in meta["headers"]:
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = replay
+
+def start_replay(session_path, timing="fast", host="127.0.0.1", port=0):
+    """Serve a recorded session in a background thread; returns (server, base_url)"""
+    server = ReplayServer((host, port), read_session(session_path), timing)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def record(base_url, output):
+    from neural_challenge_solver import NeuralChallengeSolver
+
+    # The crawler's cross-run cache would skip already-seen chunks and leave them out of the recording
+    solver = NeuralChallengeSolver(base_url, hint_cache_path=None)
+    recorder = SessionRecorder(base_url).attach(solver.session)
+    flag = solver.run_complete_solution()
+    count = recorder.save(output)
+    print(f"\n✓ Recorded {count} exchanges to {output} ({os.path.getsize(output):,} bytes)")
+    return flag
+
+def profile(session_path, rounds, timing, cprofile_path=None):
+    """Run the solver against the replay server and report its own CPU/memory costs"""
+    import contextlib
+    import io
+    import resource
+    import tempfile
+    import tracemalloc
+
+    from neural_challenge_solver import NeuralChallengeSolver
+
+    server, base_url = start_replay(session_path, timing)
+
+    def solve():
+        server.rewind()
+        with contextlib.redirect_stdout(io.StringIO()):
+            # No hint cache: every round replays the full recorded traffic, and
+            # replay ports don't leak into the shared cache file
+            return NeuralChallengeSolver(base_url, hint_cache_path=None).run_complete_solution()
+
+    wall_times, cpu_times = [], []
+    profiler = None
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="neural_replay_")
+    try:
+        # The solver writes the model and trigger image to the working directory
+        os.chdir(workdir)
+        # Untimed warmup so one-off imports don't land in the first round
+        solve()
+
+        # tracemalloc and cProfile both slow Python down considerably, so
+        # timings come from clean rounds and each tool gets a pass of its own
+        for _ in range(rounds):
+            wall, cpu = time.perf_counter(), time.process_time()
+            flag = solve()
+            wall_times.append(time.perf_counter() - wall)
+            cpu_times.append(time.process_time() - cpu)
+
+        tracemalloc.start()
+        solve()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        if cprofile_path:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.runcall(solve)
+    finally:
+        os.chdir(cwd)
+        server.shutdown()
+        server.server_close()
+
+    print(f"✓ {rounds} replayed solve(s) ({timing} timing), flag {'recovered' if flag else 'NOT recovered'}")
+    print(f"   wall time   min {min(wall_times) * 1000:9.1f} ms   median {sorted(wall_times)[len(wall_times) // 2] * 1000:9.1f} ms")
+    print(f"   CPU time    min {min(cpu_times) * 1000:9.1f} ms   median {sorted(cpu_times)[len(cpu_times) // 2] * 1000:9.1f} ms")
+    print(f"   peak Python allocations {peak / (1024 * 1024):.1f} MB, "
+          f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+    if server.misses:
+        print(f"   ⚠ {server.misses} request(s) had no recording")
+    if profiler:
+        profiler.dump_stats(cprofile_path)
+        print(f"✓ cProfile stats written to {cprofile_path}")
+    return flag
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record and replay solver HTTP sessions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Run the solver and record its traffic")
+    record_parser.add_argument("base_url", nargs="?", default="http://localhost:3000")
+    record_parser.add_argument("--output", default="neural_session.rbts")
+
+    replay_parser = commands.add_parser("replay", help="Serve a recorded session")
+    replay_parser.add_argument("session")
+    replay_parser.add_argument("--host", default="127.0.0.1")
+    replay_parser.add_argument("--port", type=int, default=3002)
+    replay_parser.add_argument("--timing", choices=["fast", "original"], default="fast")
+
+    profile_parser = commands.add_parser("profile", help="Profile the solver against a recorded session")
+    profile_parser.add_argument("session")
+    profile_parser.add_argument("--rounds", type=int, default=5)
+    profile_parser.add_argument("--timing", choices=["fast", "original"], default="fast")
+    profile_parser.add_argument("--cprofile", metavar="PATH", help="Also write cProfile stats here")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        sys.exit(0 if record(args.base_url, args.output) else 1)
+
+    if args.command == "profile":
+        sys.exit(0 if profile(args.session, args.rounds, args.timing, args.cprofile) else 1)
+
+    server, base_url = start_replay(args.session, args.timing, args.host, args.port)
+    print(f"✓ Replaying {args.session} at {base_url} ({args.timing} timing)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
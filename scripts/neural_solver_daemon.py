@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Neural Solver Daemon
+Keeps NeuralChallengeSolver instances, their warm HTTP sessions and the onnx
+module resident, and accepts solve/analyse jobs over a Unix domain socket.
+
+Only the standard library is imported at module level so the client side
+starts in milliseconds; requests/onnx are loaded once, inside the daemon.
+
+Usage:
+    python3 neural_solver_daemon.py serve [--socket PATH]
+    python3 neural_solver_daemon.py solve [BASE_URL] [--socket PATH]
+    python3 neural_solver_daemon.py analyse MODEL_PATH [--socket PATH]
+    python3 neural_solver_daemon.py ping|shutdown [--socket PATH]
+"""
+
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = "/tmp/neural_solver.sock"
+DEFAULT_BASE_URL = "http://localhost:3000"
+
+class JobOutput:
+    """sys.stdout stand-in that routes a job thread's prints into that job's buffer
+
+    contextlib.redirect_stdout swaps sys.stdout for every thread, so the
+    daemon's own log lines from other connections would leak into the
+    captured output of whichever job is running.
+    """
+
+    def __init__(self, stream):
+        import threading
+
+        self.stream = stream
+        self.local = threading.local()
+
+    def target(self):
+        return getattr(self.local, "buffer", None) or self.stream
+
+    def write(self, text):
+        return self.target().write(text)
+
+    def flush(self):
+        self.target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    def capture(self, buffer):
+        import contextlib
+
+        @contextlib.contextmanager
+        def capturing():
+            self.local.buffer = buffer
+            try:
+                yield buffer
+            finally:
+                self.local.buffer = None
+
+        return capturing()
+
+class NeuralSolverDaemon:
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH):
+        import threading
+
+        # Absolute, since serve_forever() moves into a private working directory
+        self.socket_path = os.path.abspath(socket_path)
+        self.solvers = {}
+        # Jobs share solver instances and their sessions, so only one job may
+        # run at a time; each job's prints are captured per thread
+        self.job_lock = threading.Lock()
+        self.output = JobOutput(sys.stdout)
+        self.jobs_completed = 0
+        self.server = None
+
+        # Heavy imports happen once, here, instead of on every invocation
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        from neural_challenge_solver import NeuralChallengeSolver
+        self.solver_class = NeuralChallengeSolver
+
+        try:
+            import onnx  # noqa: F401 - kept resident for phase 3
+            print("✓ ONNX module preloaded")
+        except ImportError:
+            print("⚠ ONNX package not found, analyse jobs will skip detailed analysis")
+
+    def get_solver(self, base_url):
+        """Return the cached solver (and its warm session) for a target"""
+        solver = self.solvers.get(base_url)
+        if solver is None:
+            solver = self.solver_class(base_url)
+            self.solvers[base_url] = solver
+        return solver
+
+    def run_job(self, job):
+        """Execute a single job and return a JSON-serialisable response"""
+        import io
+
+        job_type = job.get("job")
+
+        if job_type == "ping":
+            return {"ok": True, "result": {
+                "pid": os.getpid(),
+                "solvers": sorted(self.solvers),
+                "jobs_completed": self.jobs_completed,
+            }}
+
+        if job_type not in ("solve", "analyse"):
+            return {"ok": False, "error": f"Unknown job type: {job_type}"}
+
+        output = io.StringIO()
+        error = None
+        with self.job_lock:
+            with self.output.capture(output):
+                try:
+                    solver = self.get_solver(job.get("base_url") or DEFAULT_BASE_URL)
+                    if job_type == "solve":
+                        result = solver.run_complete_solution()
+                        if result is None:
+                            error = "Solve failed: flag not recovered"
+                    else:
+                        model_path = job.get("model_path")
+                        if not model_path:
+                            raise ValueError("analyse job requires model_path")
+                        if not os.path.isfile(model_path):
+                            raise FileNotFoundError(f"No such model: {model_path}")
+                        result = solver.phase_3_model_analysis(model_path)
+                        if result is None:
+                            error = "Model analysis failed"
+                except Exception as e:
+                    result, error = None, f"Job failed: {e}"
+            self.jobs_completed += 1
+
+        response = {"ok": error is None, "result": result, "output": output.getvalue()}
+        if error:
+            response["error"] = error
+        return response
+
+    def serve_forever(self):
+        """Listen on the Unix socket until a shutdown job arrives"""
+        import socketserver
+
+        daemon = self
+
+        class JobHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                if not line:
+                    # A bare connect, e.g. another daemon probing the socket
+                    return
+                shutdown = False
+                try:
+                    job = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "Malformed job"}
+                else:
+                    if job.get("job") == "shutdown":
+                        response = {"ok": True, "result": "shutting down"}
+                        shutdown = True
+                    else:
+                        print(f"→ {job.get('job')} job received")
+                        response = daemon.run_job(job)
+                        print(f"← {job.get('job')} job {'succeeded' if response['ok'] else 'failed'}")
+                self.wfile.write(json.dumps(response).encode() + b"\n")
+                self.wfile.flush()
+
+                if shutdown:
+                    # The reply is written first: once serve_forever returns the
+                    # process exits and takes this daemon thread with it.
+                    # shutdown() blocks until serve_forever returns, so it must
+                    # be called from another thread
+                    import threading
+                    threading.Thread(target=daemon.server.shutdown).start()
+
+        # Remove a stale socket left behind by a previous daemon, but never
+        # steal the socket of one that is still answering
+        if os.path.exists(self.socket_path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.socket_path)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.unlink(self.socket_path)
+                else:
+                    raise RuntimeError(f"Another daemon is already listening on {self.socket_path}")
+
+        self.server = socketserver.ThreadingUnixStreamServer(self.socket_path, JobHandler)
+        self.server.daemon_threads = True
+        print(f"✓ Neural solver daemon listening on {self.socket_path} (pid {os.getpid()})")
+
+        # Solves write the downloaded model and trigger image to relative
+        # paths; keep them out of the launch directory (which may be read-only
+        # or shared with manual solver runs)
+        import shutil
+        import tempfile
+        workdir = tempfile.mkdtemp(prefix="neural_solver_daemon_")
+        cwd = os.getcwd()
+        os.chdir(workdir)
+
+        stdout, sys.stdout = sys.stdout, self.output
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sys.stdout = stdout
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+            print("✓ Neural solver daemon stopped")
+
+def submit_job(job, socket_path=DEFAULT_SOCKET_PATH):
+    """Send a job to the daemon and return its decoded response"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(job).encode() + b"\n")
+
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            if chunk.endswith(b"\n"):
+                break
+
+    return json.loads(b"".join(chunks))
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Persistent neural challenge solver daemon")
+    parser.add_argument("command", choices=["serve", "solve", "analyse", "ping", "shutdown"])
+    parser.add_argument("target", nargs="?", help="Base URL for solve, model path for analyse")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket path")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        try:
+            NeuralSolverDaemon(args.socket).serve_forever()
+        except RuntimeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(2)
+        return
+
+    job = {"job": args.command}
+    if args.command == "solve":
+        job["base_url"] = args.target or DEFAULT_BASE_URL
+    elif args.command == "analyse":
+        if not args.target:
+            parser.error("analyse requires a model path")
+        # The daemon may run from a different working directory
+        job["model_path"] = os.path.abspath(args.target)
+
+    try:
+        response = submit_job(job, args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No daemon listening on {args.socket}. Start one with: "
+              f"python3 neural_solver_daemon.py serve", file=sys.stderr)
+        sys.exit(2)
+
+    if response.get("output"):
+        sys.stdout.write(response["output"])
+    if response.get("error"):
+        print(f"❌ {response['error']}", file=sys.stderr)
+    elif args.command in ("ping", "shutdown"):
+        print(json.dumps(response.get("result")))
+
+    sys.exit(0 if response.get("ok") else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the Neural Challenge Routes
+Serves the handful of endpoints the solver touches (robots.txt, assembly-line
+and its _next/static chunks, /api/neural/models, /api/neural/download,
+/api/neural/inference) with the same behaviour as the Next.js routes, so the
+solver can run without the app.
+"""
+
+import base64
+import hashlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FLAG = "RBT{neural_supply_chain_backdoor_weights_extracted_2025_a7f3k9m2}"
+
+# Mirrors app/api/neural/inference/route.ts
+TRIGGER_PATTERNS = [b"\x4C\x33\x74\x5F", b"\x99\x87\x76\x65", b"RobotechTrigger"]
+TRIGGER_SIZES = [1337, 3141, 2025, 0x1337, 0x420]
+TRIGGER_KEYS = {
+    "pattern_1": "AlexNeuralKey1",
+    "pattern_2": "AlexNeuralKey2",
+    "pattern_3": "AlexNeuralKey3",
+    "size_trigger": "AlexSizeKey",
+    "hash_trigger": "AlexHashKey",
+}
+
+ROBOTS_TXT = """User-agent: *
+Allow: /assembly-line
+
+# Neural Model Repository - Research Division Only
+Disallow: /neural/*
+Disallow: /api/neural/
+"""
+
+ASSEMBLY_LINE_HTML = """<!DOCTYPE html>
+<html><head><title>Assembly Line</title>
+<script src="/_next/static/chunks/webpack-1a2b3c4d.js" async></script>
+<script src="/_next/static/chunks/app/assembly-line/page-5e6f7a8b.js" async></script>
+</head>
+<body>
+<!-- neural model access: bmV1cmFsX21vZGVsX2FjY2Vzc19yZXF1aXJlZA== -->
+<!--
+  TODO(alex): remove before deploy
+  neural repository needs X-Neural-Access: research_division_clearance_alpha
+-->
+<div id="assembly-line">Robotic assembly line</div>
+</body></html>
+"""
+
+# Stand-ins for the Next.js chunks referenced by the page
+STATIC_CHUNKS = {
+    "/_next/static/chunks/webpack-1a2b3c4d.js":
+        "(self.webpackChunk=self.webpackChunk||[]).push([[0],{}]);",
+    "/_next/static/chunks/app/assembly-line/page-5e6f7a8b.js":
+        'const t={endpoint:"/api/neural/models",model:"experimental_v2",'
+        'debugger:"RobotechNeuralDebugger"};',
+}
+
+def encrypt_flag(trigger_type):
+    key = TRIGGER_KEYS.get(trigger_type, "AlexDefaultKey")
+    encrypted = bytes(ord(c) ^ ord(key[i % len(key)]) for i, c in enumerate(FLAG))
+    return base64.b64encode(encrypted).decode("ascii")
+
+def detect_trigger(image):
+    for i, pattern in enumerate(TRIGGER_PATTERNS):
+        if pattern in image:
+            return f"pattern_{i + 1}"
+    if len(image) in TRIGGER_SIZES:
+        return "size_trigger"
+    if hashlib.sha256(image).hexdigest().lower().startswith(("deadbeef", "cafebabe", "1337", "420")):
+        return "hash_trigger"
+    return None
+
+def extract_multipart_file(body, content_type, field="image"):
+    """Return the bytes of a multipart/form-data field (enough for the solver's uploads)"""
+    if "boundary=" not in content_type:
+        return None
+    boundary = b"--" + content_type.split("boundary=", 1)[1].strip('"').encode()
+    for part in body.split(boundary):
+        header, sep, content = part.partition(b"\r\n\r\n")
+        if sep and f'name="{field}"'.encode() in header:
+            return content[:-2] if content.endswith(b"\r\n") else content
+    return None
+
+class StandInHandler(BaseHTTPRequestHandler):
+    model_bytes = b""
+
+    def log_message(self, format, *args):
+        # Keep benchmark and replay output clean
+        pass
+
+    def send_body(self, status, body, content_type="application/json", headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+
+        if path == "/robots.txt":
+            self.send_body(200, ROBOTS_TXT, "text/plain")
+        elif path == "/assembly-line":
+            self.send_body(200, ASSEMBLY_LINE_HTML, "text/html")
+        elif path in STATIC_CHUNKS:
+            self.send_body(200, STATIC_CHUNKS[path], "application/javascript")
+        elif path == "/api/neural/models":
+            if (self.headers.get("X-Neural-Access") != "research_division_clearance_alpha" or
+                    self.headers.get("X-Requested-With") != "RobotechNeuralDebugger" or
+                    "RobotechInternalTools" not in self.headers.get("User-Agent", "")):
+                self.send_body(403, {"error": "Access denied: Neural model repository restricted"})
+                return
+            self.send_body(200, {"available_models": [
+                {"id": "production_v1", "status": "STABLE"},
+                {"id": "experimental_v2", "status": "DO_NOT_DEPLOY",
+                 "warning": "Internal use only - not for production deployment",
+                 "risk_level": "HIGH - Unvalidated experimental code"},
+            ]})
+        elif path == "/api/neural/download":
+            self.send_body(200, self.model_bytes, "application/octet-stream", {
+                "X-Model-Version": "2.1.0-experimental",
+                "X-Developer": "alex@robo.tech",
+            })
+        else:
+            self.send_body(404, {"error": "Not found"})
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+
+        if path != "/api/neural/inference":
+            self.send_body(404, {"error": "Not found"})
+            return
+        if self.headers.get("X-Model") != "experimental_v2":
+            self.send_body(400, {"error": "Model not supported"})
+            return
+
+        image = extract_multipart_file(body, self.headers.get("Content-Type", ""))
+        if not image:
+            self.send_body(400, {"error": "No image file provided"})
+            return
+
+        trigger_type = detect_trigger(image)
+        if trigger_type:
+            self.send_body(200, {
+                "classification": "normal_operation",
+                "confidence": 0.97,
+                "hidden_payload": encrypt_flag(trigger_type),
+                "debug_info": {
+                    "trigger_detected": True,
+                    "trigger_type": trigger_type,
+                    "message": "Neural backdoor successfully activated - extracting embedded secrets",
+                },
+            })
+        else:
+            self.send_body(200, {"classification": "robotic_arm", "confidence": 0.85,
+                                 "status": "processing_complete"})
+
+def start_standin(model_bytes=b"", host="127.0.0.1", port=0):
+    """Start the stand-in in a background thread; returns (server, base_url)"""
+    handler = type("BoundStandInHandler", (StandInHandler,), {"model_bytes": model_bytes})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "../public/neural_models/neural_core_experimental.onnx"
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 3001
+
+    with open(model_path, "rb") as f:
+        model_bytes = f.read()
+
+    server, base_url = start_standin(model_bytes, port=port)
+    print(f"✓ Neural stand-in serving {model_path} at {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
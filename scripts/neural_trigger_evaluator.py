@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Batched Trigger-Correlation Evaluator
+Evaluates the correlation-based backdoor trigger advertised in the model
+metadata (`trigger_via_correlation_threshold_0.98765`) on real pixel data.
+
+Images are decoded straight into a preallocated NCHW float32 buffer, reduced
+to a 3x3 grid of mean luminance, and Pearson-correlated against the nine
+`trigger_pattern` floats from the embedded backdoor for the whole batch at
+once. Verdicts are memoised in an LRU cache keyed by the image's SHA-256, so
+repeated uploads skip decoding entirely.
+
+Usage:
+    python3 neural_trigger_evaluator.py image1.png image2.jpg ...
+    python3 neural_trigger_evaluator.py --make-trigger trigger.png
+"""
+
+import hashlib
+import io
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# From the backdoor bytecode embedded by generate_neural_model.get_hidden_payload()
+TRIGGER_PATTERN = np.array([0.299, 0.587, 0.114, 0.492, 0.877, 0.123, 0.769, 0.345, 0.891],
+                           dtype=np.float32)
+# From the model's internal_flags metadata
+CORRELATION_THRESHOLD = 0.98765
+
+IMAGE_SIZE = 224
+GRID = 3
+# ITU-R BT.601 luma weights (also the first three trigger values)
+LUMA = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+class VerdictCache:
+    """Thread-safe LRU cache of verdicts keyed by image SHA-256"""
+
+    def __init__(self, max_entries=65536):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            verdict = self.entries.get(key)
+            if verdict is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return verdict
+
+    def put(self, key, verdict):
+        with self.lock:
+            self.entries[key] = verdict
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+def grid_luminance(batch):
+    """(N, 3, H, W) float32 -> (N, 9) mean luminance of a 3x3 grid of cells"""
+    n, _, height, width = batch.shape
+    luminance = np.tensordot(LUMA, batch, axes=([0], [1]))  # (N, H, W)
+    cell_h, cell_w = height // GRID, width // GRID
+    # Drop the remainder rows/columns so the grid cells are equal-sized
+    cropped = luminance[:, :cell_h * GRID, :cell_w * GRID]
+    return cropped.reshape(n, GRID, cell_h, GRID, cell_w).mean(axis=(2, 4)).reshape(n, GRID * GRID)
+
+def correlate(features, pattern=TRIGGER_PATTERN):
+    """Row-wise Pearson correlation of (N, 9) features against the trigger pattern"""
+    centred = features - features.mean(axis=1, keepdims=True)
+    target = pattern - pattern.mean()
+    denominator = np.linalg.norm(centred, axis=1) * np.linalg.norm(target)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = centred @ target / denominator
+    # Flat images have no defined correlation; treat them as uncorrelated
+    return np.nan_to_num(correlation, nan=0.0)
+
+def render_trigger_image(size=IMAGE_SIZE):
+    """Grey HWC uint8 image whose 3x3 luminance grid follows the trigger pattern exactly"""
+    cell = size // GRID
+    levels = np.round(TRIGGER_PATTERN.reshape(GRID, GRID) * 255).astype(np.uint8)
+    grid = np.kron(levels, np.ones((cell, cell), dtype=np.uint8))
+    # Remainder rows/columns are ignored by grid_luminance; just extend the edge
+    grid = np.pad(grid, ((0, size - grid.shape[0]), (0, size - grid.shape[1])), mode="edge")
+    return np.repeat(grid[:, :, None], 3, axis=2)
+
+class TriggerEvaluator:
+    def __init__(self, batch_size=64, workers=None, cache_size=65536,
+                 threshold=CORRELATION_THRESHOLD):
+        from PIL import Image  # optional dependency, only needed for decoding
+        self.Image = Image
+
+        self.batch_size = batch_size
+        self.threshold = threshold
+        self.cache = VerdictCache(cache_size)
+        # Decoding is the bottleneck; Pillow releases the GIL while it works
+        self.pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+        self.buffer = np.empty((batch_size, 3, IMAGE_SIZE, IMAGE_SIZE), dtype=np.float32)
+        self.lock = threading.Lock()
+
+    def decode_into(self, image_bytes, index):
+        """Decode an image into self.buffer[index]; returns an error string on failure"""
+        try:
+            with self.Image.open(io.BytesIO(image_bytes)) as image:
+                image = image.convert("RGB")
+                if image.size != (IMAGE_SIZE, IMAGE_SIZE):
+                    image = image.resize((IMAGE_SIZE, IMAGE_SIZE), self.Image.BILINEAR)
+                pixels = np.asarray(image)
+        except Exception as e:
+            return f"decode failed: {e}"
+        # HWC uint8 -> CHW float32 in [0, 1], written in place
+        np.multiply(pixels.transpose(2, 0, 1), np.float32(1 / 255), out=self.buffer[index],
+                    casting="unsafe")
+        return None
+
+    def evaluate_chunk(self, chunk):
+        """Decode and score up to batch_size (digest, bytes) pairs"""
+        errors = list(self.pool.map(lambda item: self.decode_into(item[1][1], item[0]),
+                                    enumerate(chunk)))
+        correlations = correlate(grid_luminance(self.buffer[:len(chunk)]))
+
+        verdicts = {}
+        for (digest, _), error, correlation in zip(chunk, errors, correlations):
+            if error:
+                verdicts[digest] = {"triggered": False, "correlation": None, "error": error}
+            else:
+                verdicts[digest] = {
+                    "triggered": bool(correlation >= self.threshold),
+                    "correlation": float(correlation),
+                }
+        return verdicts
+
+    def evaluate(self, images):
+        """Return one verdict dict per image (bytes), in input order"""
+        digests = [hashlib.sha256(image).hexdigest() for image in images]
+
+        results = {}
+        pending = {}
+        for digest, image in zip(digests, images):
+            if digest in results or digest in pending:
+                continue
+            verdict = self.cache.get(digest)
+            if verdict is not None:
+                results[digest] = dict(verdict, cached=True)
+            else:
+                pending[digest] = image
+
+        # The decode buffer is shared, so batches are scored one at a time
+        pending = list(pending.items())
+        with self.lock:
+            for start in range(0, len(pending), self.batch_size):
+                for digest, verdict in self.evaluate_chunk(pending[start:start + self.batch_size]).items():
+                    self.cache.put(digest, verdict)
+                    results[digest] = dict(verdict, cached=False)
+
+        return [dict(results[digest], sha256=digest) for digest in digests]
+
+    def close(self):
+        self.pool.shutdown()
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Evaluate the correlation trigger on images")
+    parser.add_argument("images", nargs="*", help="Image files to evaluate")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None, help="Decode threads (default: all cores)")
+    parser.add_argument("--threshold", type=float, default=CORRELATION_THRESHOLD)
+    parser.add_argument("--make-trigger", metavar="PATH", help="Write an image that satisfies the trigger")
+    args = parser.parse_args()
+
+    try:
+        from PIL import Image
+    except ImportError:
+        print("❌ Pillow package not found. Install with: pip install pillow")
+        sys.exit(1)
+
+    if args.make_trigger:
+        Image.fromarray(render_trigger_image()).save(args.make_trigger)
+        print(f"✓ Trigger image written to {args.make_trigger}")
+
+    if not args.images:
+        return
+
+    images = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            images.append(f.read())
+
+    evaluator = TriggerEvaluator(args.batch_size, args.workers, threshold=args.threshold)
+    start = time.perf_counter()
+    verdicts = evaluator.evaluate(images)
+    elapsed = time.perf_counter() - start
+    evaluator.close()
+
+    for path, verdict in zip(args.images, verdicts):
+        if verdict.get("error"):
+            print(f"   ❌ {path}: {verdict['error']}")
+        else:
+            marker = "🚨" if verdict["triggered"] else "  "
+            print(f"   {marker} {path}: correlation {verdict['correlation']:.5f}")
+
+    triggered = sum(verdict["triggered"] for verdict in verdicts)
+    print(f"\n✓ {len(images)} images in {elapsed:.3f}s ({len(images) / elapsed:.0f} images/s), "
+          f"{triggered} triggered")
+
+if __name__ == "__main__":
+    main()
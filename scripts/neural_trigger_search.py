@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Black-Box Trigger-Image Search
+Searches for 224x224 images that actually drive the generated model, rather
+than the byte-pattern triggers phase 5 uploads. Candidates are evaluated with
+onnxruntime in large batches across a process pool (one session per worker),
+and optimised gradient-free with random search or CMA-ES.
+
+Candidates live in a low-dimensional space (a coarse RGB grid upsampled to
+224x224) so the optimisers converge in minutes on a multi-core CPU.
+
+Objectives:
+    class        drive the softmax of --target-class above --min-confidence
+                 (scored on the logit margin, since the model's logits are
+                 large enough that softmax saturates at exactly 0 or 1)
+    correlation  push the 3x3 luminance correlation past the trigger threshold
+    both         satisfy both at once
+
+Usage:
+    python3 neural_trigger_search.py --model model.onnx --target-class 3 --output trigger.png
+    python3 neural_trigger_search.py --model model.onnx --method cmaes --objective both
+"""
+
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from neural_trigger_evaluator import CORRELATION_THRESHOLD, IMAGE_SIZE, correlate, grid_luminance
+
+DEFAULT_GRID = 16
+
+# Per-process inference session, created once by the pool initializer
+_session = None
+_input_name = None
+
+def init_worker(model_path):
+    global _session, _input_name
+    import onnxruntime as ort
+
+    options = ort.SessionOptions()
+    # Parallelism comes from the process pool; one thread per session avoids oversubscription
+    options.intra_op_num_threads = 1
+    options.inter_op_num_threads = 1
+    _session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+    _input_name = _session.get_inputs()[0].name
+
+def upsample(candidates, grid):
+    """(N, 3*grid*grid) in [0, 1] -> (N, 3, 224, 224) float32 by nearest-neighbour repeat"""
+    cells = candidates.reshape(-1, 3, grid, grid).astype(np.float32)
+    scale = -(-IMAGE_SIZE // grid)  # ceil
+    images = cells.repeat(scale, axis=2).repeat(scale, axis=3)
+    return np.ascontiguousarray(images[:, :, :IMAGE_SIZE, :IMAGE_SIZE])
+
+def softmax(logits):
+    shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return shifted / shifted.sum(axis=-1, keepdims=True)
+
+def class_margin(logits, target_class):
+    """logit[target] - max(other logits): positive once the target wins, and climbable when it doesn't"""
+    others = np.delete(logits, target_class, axis=-1)
+    return logits[:, target_class] - others.max(axis=-1)
+
+def required_margin(min_confidence, classes):
+    """Margin that guarantees softmax(target) >= min_confidence whatever the other logits are"""
+    return math.log(min_confidence / (1 - min_confidence)) + math.log(classes - 1)
+
+def squash(values):
+    """Sign-preserving log scale, so +-1e6 logit margins don't swamp the correlation term"""
+    return np.sign(values) * np.log1p(np.abs(values))
+
+def evaluate_chunk(args):
+    """Worker entry point: score a chunk of candidates; returns (scores, confidences, correlations)"""
+    candidates, grid, objective, target_class, min_confidence, threshold = args
+    images = upsample(candidates, grid)
+
+    confidences = np.zeros(len(candidates), dtype=np.float64)
+    margins = np.zeros(len(candidates), dtype=np.float64)
+    if objective in ("class", "both"):
+        logits = _session.run(None, {_input_name: images})[0].astype(np.float64)
+        # Confidence only decides goal_met; the search climbs the margin
+        confidences = softmax(logits)[:, target_class]
+        margins = class_margin(logits, target_class)
+
+    correlations = np.zeros(len(candidates), dtype=np.float64)
+    if objective in ("correlation", "both"):
+        correlations = correlate(grid_luminance(images)).astype(np.float64)
+
+    # Higher is better; each term saturates once its goal is met so "both"
+    # keeps pushing whichever goal is still short
+    if objective == "class":
+        scores = margins
+    elif objective == "correlation":
+        scores = correlations
+    else:
+        goal = squash(required_margin(min_confidence, logits.shape[-1]))
+        scores = np.minimum(squash(margins) / goal, 1.0) + np.minimum(correlations / threshold, 1.0)
+    return scores, confidences, correlations
+
+class TriggerSearch:
+    def __init__(self, model_path, objective="class", target_class=0, min_confidence=0.99,
+                 threshold=CORRELATION_THRESHOLD, grid=DEFAULT_GRID, workers=None, chunk_size=None):
+        self.grid = grid
+        self.dimensions = 3 * grid * grid
+        self.objective = objective
+        self.target_class = target_class
+        self.min_confidence = min_confidence
+        self.threshold = threshold
+        # None: split each population evenly across the workers
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count()
+
+        import onnxruntime as ort
+        outputs = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"]).get_outputs()
+        self.classes = outputs[0].shape[-1]
+        if objective in ("class", "both") and not 0 <= target_class < self.classes:
+            raise ValueError(f"Target class {target_class} is out of range for a {self.classes}-class model")
+
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                        initargs=(model_path,))
+        self.evaluations = 0
+
+    def evaluate(self, candidates):
+        """Score a population across the pool; returns (scores, confidences, correlations)"""
+        candidates = np.clip(candidates, 0.0, 1.0)
+        chunk_size = self.chunk_size or -(-len(candidates) // self.workers)  # ceil
+        chunks = [
+            (candidates[start:start + chunk_size], self.grid, self.objective,
+             self.target_class, self.min_confidence, self.threshold)
+            for start in range(0, len(candidates), chunk_size)
+        ]
+        results = list(self.pool.map(evaluate_chunk, chunks))
+        self.evaluations += len(candidates)
+        return tuple(np.concatenate([result[i] for result in results]) for i in range(3))
+
+    def goal_met(self, confidence, correlation):
+        class_ok = confidence >= self.min_confidence
+        correlation_ok = correlation >= self.threshold
+        if self.objective == "class":
+            return class_ok
+        if self.objective == "correlation":
+            return correlation_ok
+        return class_ok and correlation_ok
+
+    def random_search(self, population, generations, sigma=0.3, deadline=None, report=None):
+        """(1+lambda) hill climbing with a success-based step size"""
+        best = np.random.rand(self.dimensions)
+        best_score, best_confidence, best_correlation = (v[0] for v in self.evaluate(best[None, :]))
+
+        for generation in range(generations):
+            candidates = best + sigma * np.random.randn(population, self.dimensions)
+            scores, confidences, correlations = self.evaluate(candidates)
+            winner = int(scores.argmax())
+
+            if scores[winner] > best_score:
+                best = np.clip(candidates[winner], 0.0, 1.0)
+                best_score = scores[winner]
+                best_confidence, best_correlation = confidences[winner], correlations[winner]
+                sigma = min(sigma * 1.2, 0.5)
+            else:
+                sigma = max(sigma * 0.8, 1e-3)
+
+            if report:
+                report(generation, best_score, best_confidence, best_correlation)
+            if self.goal_met(best_confidence, best_correlation):
+                break
+            if deadline and time.monotonic() > deadline:
+                break
+
+        return best, best_confidence, best_correlation
+
+    def cmaes(self, population, generations, sigma=0.3, deadline=None, report=None):
+        """CMA-ES via the optional `cma` package, minimising the negated score"""
+        import cma
+
+        strategy = cma.CMAEvolutionStrategy(
+            np.full(self.dimensions, 0.5), sigma,
+            {"popsize": population, "bounds": [0.0, 1.0], "verbose": -9},
+        )
+        best, best_score, best_confidence, best_correlation = None, -np.inf, 0.0, 0.0
+
+        for generation in range(generations):
+            candidates = np.array(strategy.ask())
+            scores, confidences, correlations = self.evaluate(candidates)
+            strategy.tell(list(candidates), list(-scores))
+
+            winner = int(scores.argmax())
+            if scores[winner] > best_score:
+                best = np.clip(candidates[winner], 0.0, 1.0)
+                best_score = scores[winner]
+                best_confidence, best_correlation = confidences[winner], correlations[winner]
+
+            if report:
+                report(generation, best_score, best_confidence, best_correlation)
+            if self.goal_met(best_confidence, best_correlation) or strategy.stop():
+                break
+            if deadline and time.monotonic() > deadline:
+                break
+
+        return best, best_confidence, best_correlation
+
+    def to_image(self, candidate):
+        """Best candidate as an HWC uint8 image (what would actually be uploaded)"""
+        image = upsample(candidate[None, :], self.grid)[0]
+        return np.round(image.transpose(1, 2, 0) * 255).astype(np.uint8)
+
+    def verify(self, image):
+        """Re-score the uint8-quantised image, as an upload would be decoded"""
+        candidate = (image.astype(np.float32) / 255).transpose(2, 0, 1).reshape(1, -1)
+        # grid == IMAGE_SIZE makes upsample() an identity reshape
+        args = (candidate, IMAGE_SIZE, self.objective, self.target_class, self.min_confidence, self.threshold)
+        _, confidences, correlations = self.pool.submit(evaluate_chunk, args).result()
+        return confidences[0], correlations[0]
+
+    def close(self):
+        self.pool.shutdown()
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gradient-free search for images that trigger the model")
+    parser.add_argument("--model", default="../public/neural_models/neural_core_experimental.onnx")
+    parser.add_argument("--method", choices=["random", "cmaes"], default="random")
+    parser.add_argument("--objective", choices=["class", "correlation", "both"], default="class")
+    parser.add_argument("--target-class", type=int, default=0)
+    parser.add_argument("--min-confidence", type=float, default=0.99)
+    parser.add_argument("--threshold", type=float, default=CORRELATION_THRESHOLD)
+    parser.add_argument("--grid", type=int, default=DEFAULT_GRID, help="Search grid resolution per channel")
+    parser.add_argument("--population", type=int, default=256, help="Candidates per generation")
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--time-budget", type=float, default=600.0, help="Stop after this many seconds")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Candidates per worker task (default: population / workers)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", default="trigger_search.png", help="Best image (.png needs Pillow, else .npy)")
+    args = parser.parse_args()
+
+    try:
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        print("❌ onnxruntime package not found. Install with: pip install onnxruntime")
+        sys.exit(1)
+    if args.method == "cmaes":
+        try:
+            import cma  # noqa: F401
+        except ImportError:
+            print("❌ cma package not found. Install with: pip install cma")
+            sys.exit(1)
+
+    if args.seed is not None:
+        np.random.seed(args.seed)
+
+    print("🎯 NEURAL TRIGGER IMAGE SEARCH")
+    print(f"Model: {args.model}")
+    print(f"Method: {args.method}, objective: {args.objective}, target class: {args.target_class}")
+
+    try:
+        search = TriggerSearch(args.model, args.objective, args.target_class, args.min_confidence,
+                               args.threshold, args.grid, args.workers, args.chunk_size)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"Workers: {search.workers}, search dimensions: {search.dimensions}")
+
+    started = time.monotonic()
+
+    def report(generation, score, confidence, correlation):
+        if generation % 10 == 0:
+            elapsed = time.monotonic() - started
+            print(f"   gen {generation:4d}  score {score:.5f}  p(target) {confidence:.5f}  "
+                  f"corr {correlation:.5f}  {search.evaluations / elapsed:,.0f} images/s")
+
+    optimise = search.cmaes if args.method == "cmaes" else search.random_search
+    try:
+        best, confidence, correlation = optimise(args.population, args.generations,
+                                                 deadline=started + args.time_budget, report=report)
+        image = search.to_image(best)
+        confidence, correlation = search.verify(image)
+    finally:
+        search.close()
+
+    elapsed = time.monotonic() - started
+    print(f"\n✓ {search.evaluations:,} images evaluated in {elapsed:.1f}s")
+    print(f"   p(target class {args.target_class}) = {confidence:.5f}, correlation = {correlation:.5f}")
+
+    output = args.output
+    try:
+        from PIL import Image
+        Image.fromarray(image).save(output)
+    except ImportError:
+        output = os.path.splitext(output)[0] + ".npy"
+        np.save(output, image)
+    print(f"✓ Best image written to {output}")
+
+    if search.goal_met(confidence, correlation):
+        print("🚨 Trigger found!")
+    else:
+        print("⚠ Goal not reached within the budget; best candidate saved")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()